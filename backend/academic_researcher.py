@@ -0,0 +1,180 @@
+"""
+Investigador Académico (Módulo de Análisis Estadístico).
+Estadística de grupos experimentales calculada en el backend y vectorizada sobre todas
+las columnas KPI a la vez: medias, varianzas, intervalos de confianza y pruebas t
+independientes contra el grupo de control (`test_type`: "t_test_ind" con varianza combinada
+o "welch" con varianzas distintas). Los parámetros salen del bloque `academic_researcher`
+de config/nexo_config.json.
+"""
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from scipy import stats
+
+from config import settings
+
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent.parent / "config" / "nexo_config.json"
+TEST_TYPES = ("t_test_ind", "welch")
+
+
+class ModuleDisabledError(RuntimeError):
+    pass
+
+
+@lru_cache(maxsize=1)
+def load_nexo_config() -> Dict[str, Any]:
+    path = Path(settings.NEXO_CONFIG_PATH) if settings.NEXO_CONFIG_PATH else DEFAULT_CONFIG_PATH
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def researcher_config() -> Dict[str, Any]:
+    """
+    Flattened parameters + thresholds of the academic_researcher module.
+    """
+    try:
+        module = load_nexo_config()["modules"]["academic_researcher"]
+    except (FileNotFoundError, KeyError):
+        # e.g. the backend container only mounts backend/: set NEXO_CONFIG_PATH
+        raise ModuleDisabledError("No se encontró la configuración de academic_researcher (NEXO_CONFIG_PATH)")
+    if not module.get("enabled", False):
+        raise ModuleDisabledError("El módulo academic_researcher está deshabilitado en nexo_config.json")
+    return {**module.get("parameters", {}), **module.get("thresholds", {})}
+
+
+def _column_list(values: np.ndarray) -> List[Optional[float]]:
+    # NaN/inf are not valid JSON: they go out as null, named in the warnings (_undefined)
+    return [float(v) if np.isfinite(v) else None for v in values]
+
+
+def _undefined(kpis: List[str], **columns: np.ndarray) -> List[str]:
+    """
+    "statistic (kpi, ...)" for every statistic with a non-finite value in some KPI column.
+    """
+    return [f"{name} ({', '.join(kpi for kpi, v in zip(kpis, values) if not np.isfinite(v))})"
+            for name, values in columns.items() if not np.isfinite(values).all()]
+
+
+def group_matrix(observations: List[Dict[str, float]], kpis: List[str]) -> np.ndarray:
+    """
+    (n x K) matrix of one group's observations; KPIs missing from an observation are NaN.
+    """
+    matrix = np.full((len(observations), len(kpis)), np.nan)
+    for i, observation in enumerate(observations):
+        for j, kpi in enumerate(kpis):
+            value = observation.get(kpi)
+            if value is not None:
+                matrix[i, j] = value
+    return matrix
+
+
+def analyze_groups(groups: Dict[str, List[Dict[str, float]]], control_group: Optional[str] = None,
+                   kpis: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Estadística descriptiva por grupo y pruebas t (control vs cada grupo) para todos los KPIs.
+
+    Args:
+        groups: group key -> list of observations ({kpi: value}).
+        control_group: reference group for the t-tests (default: the first group).
+        kpis: KPI columns to analyze (default: every KPI seen in any observation, sorted).
+
+    Returns:
+        Dict of column-aligned lists (one value per KPI) per group and per comparison.
+    """
+    config = researcher_config()
+    confidence_level = config.get("confidence_level", 0.95)
+    alpha = config.get("alpha_significance", 0.05)
+    min_sample_size = config.get("min_sample_size", 2)
+    variance_warning_limit = config.get("variance_warning_limit")
+    test_type = config.get("test_type", "t_test_ind")
+    if test_type not in TEST_TYPES:
+        raise ModuleDisabledError(f"test_type no soportado en nexo_config.json: {test_type} (usa {' o '.join(TEST_TYPES)})")
+
+    if not groups:
+        raise ValueError("Se requiere al menos un grupo")
+    control_group = control_group or next(iter(groups))
+    if control_group not in groups:
+        raise ValueError(f"Grupo de control desconocido: {control_group}")
+    if kpis is None:
+        kpis = sorted({kpi for observations in groups.values() for obs in observations for kpi in obs})
+
+    warnings = []
+    summary = {}
+    for key, observations in groups.items():
+        matrix = group_matrix(observations, kpis)
+        count = (~np.isnan(matrix)).sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nansum(matrix, axis=0) / np.where(count > 0, count, np.nan)
+            variance = np.nansum((matrix - mean) ** 2, axis=0) / np.where(count > 1, count - 1, np.nan)
+            std_dev = np.sqrt(variance)
+            std_error = std_dev / np.sqrt(count)
+            t_critical = stats.t.ppf((1 + confidence_level) / 2, np.where(count > 1, count - 1, np.nan))
+            cv_percent = np.abs(std_dev / mean) * 100
+
+        summary[key] = {"count": count, "mean": mean, "variance": variance}
+        if (count < min_sample_size).any():
+            short = [kpi for kpi, n in zip(kpis, count) if n < min_sample_size]
+            warnings.append(f"Grupo {key}: menos de {min_sample_size} muestras en {', '.join(short)}")
+        if variance_warning_limit is not None and (cv_percent > variance_warning_limit).any():
+            noisy = [kpi for kpi, cv in zip(kpis, cv_percent) if cv > variance_warning_limit]
+            warnings.append(f"Grupo {key}: coeficiente de variación > {variance_warning_limit}% en {', '.join(noisy)}")
+
+        undefined = _undefined(kpis, mean=mean, variance=variance, ci=t_critical * std_error)
+        if undefined:
+            warnings.append(f"Grupo {key}: sin valor finito (null) en {'; '.join(undefined)}")
+
+        summary[key]["report"] = {
+            "count": count.tolist(),
+            "mean": _column_list(mean),
+            "variance": _column_list(variance),
+            "std_dev": _column_list(std_dev),
+            "ci_low": _column_list(mean - t_critical * std_error),
+            "ci_high": _column_list(mean + t_critical * std_error),
+        }
+
+    # Independent two-sample t-test (pooled variance or Welch), every KPI column at once
+    control = summary[control_group]
+    comparisons = []
+    for key, group in summary.items():
+        if key == control_group:
+            continue
+        n1, n2 = control["count"], group["count"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if test_type == "welch":
+                # Undefined (NaN) unless both groups have a variance, i.e. two or more samples
+                v1, v2 = control["variance"] / n1, group["variance"] / n2
+                standard_error = np.sqrt(v1 + v2)
+                dof = (v1 + v2) ** 2 / (v1 ** 2 / (n1 - 1) + v2 ** 2 / (n2 - 1))
+            else:
+                dof = n1 + n2 - 2
+                # A single observation contributes no squared deviations (its variance is undefined)
+                squares1 = np.where(n1 > 1, (n1 - 1) * control["variance"], 0)
+                squares2 = np.where(n2 > 1, (n2 - 1) * group["variance"], 0)
+                pooled = (squares1 + squares2) / np.where(dof > 0, dof, np.nan)
+                standard_error = np.sqrt(pooled * (1 / n1 + 1 / n2))
+            t_statistic = (group["mean"] - control["mean"]) / standard_error
+            p_value = 2 * stats.t.sf(np.abs(t_statistic), np.where(dof > 0, dof, np.nan))
+        undefined = _undefined(kpis, t_statistic=t_statistic, p_value=p_value)
+        if undefined:
+            warnings.append(f"{key} vs {control_group}: sin valor finito (null) en {'; '.join(undefined)}")
+        comparisons.append({
+            "group": key,
+            "control": control_group,
+            "mean_difference": _column_list(group["mean"] - control["mean"]),
+            "t_statistic": _column_list(t_statistic),
+            "p_value": _column_list(p_value),
+            "significant": [bool(p < alpha) if not np.isnan(p) else False for p in p_value],
+        })
+
+    return {
+        "kpis": kpis,
+        "confidence_level": confidence_level,
+        "alpha": alpha,
+        "test_type": test_type,
+        "groups": {key: group["report"] for key, group in summary.items()},
+        "comparisons": comparisons,
+        "warnings": warnings,
+    }
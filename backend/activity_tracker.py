@@ -0,0 +1,123 @@
+"""
+Activity Tracker (Auth).
+Logins and authenticated requests record a timestamp in memory; a daemon thread writes them to
+`users.last_login_at` / `users.last_seen_at` every ACTIVITY_FLUSH_INTERVAL_SECONDS with one
+executemany UPDATE per column. Only the newest timestamp per user is kept between flushes,
+and stop() flushes what is left (graceful shutdown).
+
+Core UPDATEs on purpose: no ORM session, so the principal-cache invalidation hooks do not
+fire and `updated_at` is left alone.
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import and_, bindparam, or_, update
+
+from config import settings
+from database import engine
+from models import User
+
+logger = logging.getLogger(__name__)
+
+users_table = User.__table__
+
+
+def _update_statement(column_name: str):
+    column = users_table.c[column_name]
+    # Several workers flush independently: never move a timestamp backwards
+    return (
+        update(users_table)
+        .where(and_(users_table.c.id == bindparam("user_id"),
+                    or_(column.is_(None), column < bindparam("at"))))
+        .values({column_name: bindparam("at"), "updated_at": users_table.c.updated_at})
+    )
+
+
+class ActivityTracker:
+    """
+    In-memory buffer of user activity, flushed in batches.
+    """
+
+    def __init__(self, bind=engine, flush_interval: float = 10.0):
+        self._engine = bind
+        self.flush_interval = flush_interval
+        self._logins: Dict[str, datetime] = {}
+        self._seen: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.flushed = 0
+
+    def record_login(self, user_id: str, at: Optional[datetime] = None):
+        at = at or datetime.utcnow()
+        with self._lock:
+            self._logins[user_id] = at
+            self._seen[user_id] = at
+
+    def record_seen(self, user_id: str, at: Optional[datetime] = None):
+        at = at or datetime.utcnow()
+        with self._lock:
+            self._seen[user_id] = at
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._logins) + len(self._seen)
+
+    def flush(self) -> int:
+        """
+        Writes the buffered timestamps. On failure they go back to the buffer (newest wins).
+        """
+        with self._lock:
+            logins, self._logins = self._logins, {}
+            seen, self._seen = self._seen, {}
+        if not logins and not seen:
+            return 0
+
+        try:
+            with self._engine.begin() as conn:
+                if logins:
+                    conn.execute(_update_statement("last_login_at"),
+                                 [{"user_id": user_id, "at": at} for user_id, at in logins.items()])
+                if seen:
+                    conn.execute(_update_statement("last_seen_at"),
+                                 [{"user_id": user_id, "at": at} for user_id, at in seen.items()])
+        except Exception:
+            with self._lock:
+                for buffered, failed in ((self._logins, logins), (self._seen, seen)):
+                    for user_id, at in failed.items():
+                        if user_id not in buffered or buffered[user_id] < at:
+                            buffered[user_id] = at
+            raise
+
+        written = len(logins) + len(seen)
+        self.flushed += written
+        return written
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="activity-tracker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Activity flush on shutdown failed: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Activity flush failed: {e}")
+
+
+activity_tracker = ActivityTracker(flush_interval=settings.ACTIVITY_FLUSH_INTERVAL_SECONDS)
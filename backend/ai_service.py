@@ -40,9 +40,12 @@ def generate_nexo_response(context: ContextPayload, user_prompt: str) -> str:
         print(f"Error generating AI response: {e}")
         return "Lo siento, hubo un error al procesar tu solicitud con el motor de IA. Por favor verifica tu conexión o intenta más tarde."
 
-def generate_kairos_verdict(user_query: str, yield_bio_oil: float, avg_irr: float, profitability: float) -> str:
+def generate_kairos_verdict(user_query: str, yield_bio_oil: float, avg_irr: float, profitability: float,
+                            iterations: int = 5000, price_uncertainty: float = 30, opex_per_year: float = 1_500_000,
+                            cost_of_capital: float = 12) -> str:
     """
     Generates a financial verdict from Kairos (Auditor Persona).
+    The figures (cost_of_capital in %) come from the backend Monte Carlo (kairos_engine) and are quoted verbatim.
     """
     try:
         # Using 1.5-pro for complex reasoning/auditing as per architecture
@@ -60,16 +63,16 @@ def generate_kairos_verdict(user_query: str, yield_bio_oil: float, avg_irr: floa
       - Rendimiento de Bio-Aceite optimizado: {yield_bio_oil:.1f}%
       
       RESULTADOS DE MI SIMULACIÓN INTERNA DE RIESGOS (M5):
-      - Metodología: Simulación de Monte Carlo (5000 iteraciones) contra supuestos de mercado (incertidumbre de precios del 30% y OPEX de 1.5M€).
+      - Metodología: Simulación de Monte Carlo ({iterations} iteraciones) contra supuestos de mercado (incertidumbre de precios del {price_uncertainty:.0f}% y OPEX de {opex_per_year / 1e6:.1f}M€).
       - TIR Promedio: {avg_irr:.1f}%
-      - Probabilidad de Rentabilidad (vs 12% Coste Capital): {profitability:.0f}%
+      - Probabilidad de Rentabilidad (vs {cost_of_capital:.1f}% Coste Capital): {profitability:.0f}%
 
       INSTRUCCIONES PARA LA RESPUESTA:
       1. Comienza EXACTAMENTE con: "Kairos reportándose como Oponente Crítico."
       2. Resume que has recibido el paquete de Hefesto, tomado el yield optimizado, y lo has ejecutado a través de tu simulador M5 contra los supuestos de mercado.
       3. Declara tu veredicto: "La optimización técnica es financieramente sólida."
       4. Reporta los resultados numéricos EXACTOS de tu simulación (TIR Promedio y Probabilidad de Rentabilidad).
-      5. Valida el resultado comparando el TIR Promedio con el coste de capital del 12%.
+      5. Valida el resultado comparando el TIR Promedio con el coste de capital del {cost_of_capital:.1f}%.
       6. Concluye con tu aprobación para ratificar la configuración como la nueva línea base.
       7. El tono debe ser el de un auditor: factual, cuantitativo y decisivo.
     """
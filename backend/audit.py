@@ -1,18 +1,181 @@
-from sqlalchemy.orm import Session
-from database import SessionLocal
+from typing import List, Optional
+from datetime import datetime, timezone
+from sqlalchemy import insert
+from database import engine
 from models import AuditLog
+from audit_rollups import add_to_rollups
+from config import settings
+from prometheus_client import Counter, Gauge
+import atexit
 import json
 import logging
+import queue
+import threading
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+AUDIT_ENQUEUED = Counter("audit_events_enqueued_total", "Audit events accepted by the writer queue")
+AUDIT_WRITTEN = Counter("audit_events_written_total", "Audit events committed to audit_logs")
+AUDIT_DROPPED = Counter(
+    "audit_events_dropped_total",
+    "Audit events lost: queue full after the backpressure wait, or the row failed to write on its own",
+    ["reason"],
+)
+AUDIT_QUEUE_DEPTH = Gauge("audit_queue_depth", "Audit events waiting for the writer thread")
+
+_STOP = object()
+
+
+class AuditWriter:
+    """
+    Group-commit audit pipeline.
+    Callers enqueue rows (bounded queue); one writer thread commits them with a multi-row
+    INSERT when `batch_size` rows are waiting or `flush_interval` has passed since the
+    first one, adding them to the rollups (audit_rollups.py) in the same transaction. A batch
+    that fails twice is written row by row, so only the failing rows are dropped. A full
+    queue makes callers wait up to `enqueue_timeout` (backpressure), then the event is
+    dropped and counted. stop() drains the queue before returning.
+    """
+
+    def __init__(self, bind=engine, max_queue: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 0.2, enqueue_timeout: float = 0.05):
+        self._engine = bind
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+
+    def submit(self, row: dict) -> bool:
+        self.start()
+        try:
+            self._queue.put(row, timeout=self.enqueue_timeout)
+        except queue.Full:
+            self.dropped += 1
+            AUDIT_DROPPED.labels("queue_full").inc()
+            logger.error(f"Audit queue full: dropped {row['action_type']} by {row['actor_id']}")
+            return False
+        AUDIT_ENQUEUED.inc()
+        return True
+
+    def start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """
+        Flushes everything queued so far and stops the writer thread.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._queue.put(_STOP)  # blocks if full: the writer is draining it
+        thread.join(timeout=timeout)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            stopping = batch[0] is _STOP
+            while not stopping and len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    row = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if row is _STOP:
+                    stopping = True
+                else:
+                    batch.append(row)
+
+            rows = [row for row in batch if row is not _STOP]
+            if rows:
+                self._write(rows)
+            if stopping:
+                # Drain whatever was enqueued before stop()
+                rest = []
+                while True:
+                    try:
+                        row = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if row is not _STOP:
+                        rest.append(row)
+                for i in range(0, len(rest), self.batch_size):
+                    self._write(rest[i:i + self.batch_size])
+                return
+
+    def _insert(self, rows: List[dict]):
+        with self._engine.begin() as conn:
+            conn.execute(insert(AuditLog).values(rows))
+            add_to_rollups(conn, rows)
+        self.written += len(rows)
+        AUDIT_WRITTEN.inc(len(rows))
+
+    def _write(self, rows: List[dict]):
+        for attempt in (1, 2):
+            try:
+                self._insert(rows)
+                self.batches += 1
+                logger.info(f"AUDIT LOG: {len(rows)} entries written")
+                return
+            except Exception as e:
+                logger.error(f"Failed to write {len(rows)} audit logs (attempt {attempt}): {str(e)}")
+                if attempt == 1:
+                    time.sleep(self.flush_interval)
+        # One bad row (e.g. FK on a user deleted since it was queued) must not sink the batch:
+        # write row by row and drop only the rows that still fail
+        for row in rows:
+            try:
+                self._insert([row])
+            except Exception as e:
+                logger.error(f"Dropped audit log {row['action_type']} by {row['actor_id']}: {str(e)}")
+                self.dropped += 1
+                AUDIT_DROPPED.labels("write_failed").inc()
+        self.batches += 1
+
+
+audit_writer = AuditWriter(
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_MS / 1000,
+    enqueue_timeout=settings.AUDIT_ENQUEUE_TIMEOUT_MS / 1000,
+)
+AUDIT_QUEUE_DEPTH.set_function(audit_writer.pending)
+# Scripts that log without the API's shutdown hook still get their events written
+atexit.register(audit_writer.stop)
+
+
+def _audit_row(actor_id: str, action_type: str, target_id: str = None, details: dict = None, ip_address: str = None) -> dict:
+    return {
+        "actor_id": actor_id,
+        "target_id": target_id,
+        "action_type": action_type,
+        "details": json.dumps(details) if details else None,
+        "ip_address": ip_address,
+        "timestamp": datetime.now(timezone.utc),  # when it happened, not when the batch is written
+    }
+
 def log_action_background(actor_id: str, action_type: str, target_id: str = None, details: dict = None, ip_address: str = None):
     """
-    Creates an audit log entry in a background task.
-    Uses its own database session to avoid conflicts with the request session.
-    
+    Queues an audit log entry for the group-commit writer (audit_writer).
+    Returns at once unless the queue is full (then waits up to AUDIT_ENQUEUE_TIMEOUT_MS).
+
     Args:
         actor_id (str): The ID of the user performing the action.
         action_type (str): The type of action (e.g., "LOGIN", "CREATE_USER").
@@ -20,24 +183,12 @@ def log_action_background(actor_id: str, action_type: str, target_id: str = None
         details (dict, optional): Additional details about the action.
         ip_address (str, optional): The IP address of the actor.
     """
-    db = SessionLocal()
-    try:
-        details_str = json.dumps(details) if details else None
-        
-        audit_entry = AuditLog(
-            actor_id=actor_id,
-            target_id=target_id,
-            action_type=action_type,
-            details=details_str,
-            ip_address=ip_address
-        )
-        
-        db.add(audit_entry)
-        db.commit()
-        logger.info(f"AUDIT LOG: {action_type} by {actor_id} on {target_id}")
-        
-    except Exception as e:
-        logger.error(f"Failed to create audit log: {str(e)}")
-        db.rollback()
-    finally:
-        db.close()
+    audit_writer.submit(_audit_row(actor_id, action_type, target_id, details, ip_address))
+
+def log_actions_background(entries: List[dict]):
+    """
+    Batched variant of log_action_background. Each entry takes the keyword arguments
+    of log_action_background.
+    """
+    for entry in entries:
+        audit_writer.submit(_audit_row(**entry))
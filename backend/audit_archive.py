@@ -0,0 +1,396 @@
+"""
+Audit Log Retention (Admin Console).
+Rows older than AUDIT_RETENTION_DAYS leave the hot `audit_logs` table for gzip JSONL segments,
+one per UTC day (`audit-YYYY-MM-DD.jsonl.gz`, `.2`, `.3`... if rows for an archived day show
+up later), listed in `manifest.json` with their time and id range, row count and action types.
+
+Archiving a day: stream its rows (yield_per) into a temporary file, fsync, rename, record the
+segment in the manifest, then delete the rows in batches of AUDIT_RETENTION_BATCH_SIZE, each
+batch its own short transaction. A segment stays `"deleted": false` until its rows are gone,
+so a run interrupted between the two steps finishes the deletes on the next run instead of
+archiving the rows twice.
+
+GET /admin/audit-logs reads the archive through page(): the same filters and (timestamp, id)
+cursor, merged with the hot rows. Only segments that can hold rows for the page are opened.
+
+Uso (cron, desde backend/):
+    python audit_archive.py
+"""
+import gzip
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from prometheus_client import Counter
+from sqlalchemy import delete, func, select
+
+from audit_query import AuditLogFilters
+from config import settings
+from database import engine
+from models import AuditLog
+from schemas import AuditLogResponse
+
+logger = logging.getLogger(__name__)
+
+AUDIT_ARCHIVED = Counter("audit_rows_archived_total", "Audit rows moved from audit_logs to archive segments")
+
+MANIFEST = "manifest.json"
+LOCK = ".retention.lock"
+LOCK_STALE_SECONDS = 6 * 3600
+COLUMNS = ("id", "actor_id", "target_id", "action_type", "details", "ip_address", "timestamp")
+
+Key = Tuple[datetime, int]
+
+
+def naive_utc(value: datetime) -> datetime:
+    """
+    SQLite hands back naive UTC datetimes, Postgres aware ones: compare everything as naive UTC.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def row_key(row) -> Key:
+    return naive_utc(row.timestamp), row.id
+
+
+def _matches(row: dict, filters: AuditLogFilters) -> bool:
+    return ((filters.actor_id is None or row["actor_id"] == filters.actor_id)
+            and (filters.action_type is None or row["action_type"] == filters.action_type)
+            and (filters.target_id is None or row["target_id"] == filters.target_id))
+
+
+class RetentionBusyError(RuntimeError):
+    pass
+
+
+class _RetentionLock:
+    """
+    Lock file in the archive directory: one archiver at a time across workers and cron runs.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __enter__(self):
+        for _ in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) > LOCK_STALE_SECONDS:
+                        os.remove(self.path)  # left behind by a crashed run
+                        continue
+                except FileNotFoundError:
+                    continue
+                raise RetentionBusyError("Otro proceso está archivando la auditoría")
+            with os.fdopen(fd, "w") as f:
+                f.write(f"{os.getpid()} {datetime.utcnow().isoformat()}\n")
+            return self
+        raise RetentionBusyError("Otro proceso está archivando la auditoría")
+
+    def __exit__(self, *exc):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class AuditArchive:
+    """
+    Archive directory + retention job. The manifest is re-read when another process changes it.
+    """
+
+    def __init__(self, directory: str, bind=engine, retention_days: int = 0, batch_size: int = 5000,
+                 interval: float = 3600):
+        self.directory = directory
+        self._engine = bind
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self._manifest: List[dict] = []
+        self._manifest_mtime: Optional[Tuple[int, int]] = None
+        self._manifest_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Manifest ---
+
+    def segments(self) -> List[dict]:
+        path = os.path.join(self.directory, MANIFEST)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return []
+        mtime = (stat.st_mtime_ns, stat.st_size)
+        with self._manifest_lock:
+            if mtime != self._manifest_mtime:
+                with open(path, encoding="utf-8") as f:
+                    self._manifest = json.load(f)["segments"]
+                self._manifest_mtime = mtime
+            return self._manifest
+
+    def _save_manifest(self, segments: List[dict]):
+        path = os.path.join(self.directory, MANIFEST)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "segments": segments}, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    # --- Retention ---
+
+    def cutoff(self, now: Optional[datetime] = None) -> datetime:
+        """
+        Start of the oldest UTC day kept in audit_logs: only whole days are archived.
+        """
+        today = naive_utc(now or datetime.now(timezone.utc)).replace(hour=0, minute=0, second=0, microsecond=0)
+        return today - timedelta(days=self.retention_days)
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Archives every day before cutoff() and deletes it from audit_logs.
+        Returns the number of segments written and rows archived / deleted.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        stats = {"segments": 0, "archived": 0, "deleted": 0}
+        with _RetentionLock(os.path.join(self.directory, LOCK)):
+            segments = [dict(s) for s in self.segments()]
+
+            # 1. Finish deletes interrupted after their segment was written
+            for segment in segments:
+                if not segment["deleted"]:
+                    stats["deleted"] += self._delete_segment_rows(segment)
+                    segment["deleted"] = True
+                    self._save_manifest(segments)
+
+            # 2. Oldest day first until the cutoff
+            cutoff = self.cutoff(now)
+            while True:
+                with self._engine.connect() as conn:
+                    oldest = conn.execute(select(func.min(AuditLog.timestamp)).where(AuditLog.timestamp < cutoff)).scalar()
+                if oldest is None:
+                    break
+                day = naive_utc(oldest).replace(hour=0, minute=0, second=0, microsecond=0)
+                segment = self._write_segment(day, segments)
+                segments.append(segment)
+                self._save_manifest(segments)
+                stats["segments"] += 1
+                stats["archived"] += segment["rows"]
+                AUDIT_ARCHIVED.inc(segment["rows"])
+
+                stats["deleted"] += self._delete_segment_rows(segment)
+                segment["deleted"] = True
+                self._save_manifest(segments)
+                logger.info(f"AUDIT ARCHIVE: {segment['rows']} rows of {segment['day']} -> {segment['file']}")
+        return stats
+
+    def _write_segment(self, day: datetime, segments: List[dict]) -> dict:
+        label = day.date().isoformat()
+        part = 1 + sum(1 for s in segments if s["day"] == label)
+        name = f"audit-{label}.jsonl.gz" if part == 1 else f"audit-{label}.{part}.jsonl.gz"
+        path = os.path.join(self.directory, name)
+        tmp = f"{path}.tmp"
+
+        table = AuditLog.__table__
+        query = (
+            select(table)
+            .where(table.c.timestamp >= day, table.c.timestamp < day + timedelta(days=1))
+            .order_by(table.c.timestamp, table.c.id)
+        )
+        rows, min_id, max_id, first, last, actions = 0, None, None, None, None, {}
+        with open(tmp, "wb") as raw:
+            with self._engine.connect() as conn, gzip.GzipFile(fileobj=raw, mode="wb") as out:
+                for row in conn.execution_options(yield_per=self.batch_size).execute(query).mappings():
+                    record = {column: row[column] for column in COLUMNS}
+                    record["timestamp"] = naive_utc(row["timestamp"]).isoformat()
+                    out.write(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+                    rows += 1
+                    min_id = row["id"] if min_id is None else min(min_id, row["id"])
+                    max_id = row["id"] if max_id is None else max(max_id, row["id"])
+                    first = first or record["timestamp"]
+                    last = record["timestamp"]
+                    actions[row["action_type"]] = actions.get(row["action_type"], 0) + 1
+            raw.flush()
+            os.fsync(raw.fileno())
+        digest = hashlib.sha256()
+        with open(tmp, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        os.replace(tmp, path)
+
+        return {
+            "file": name,
+            "day": label,
+            "part": part,
+            "rows": rows,
+            "first": first,
+            "last": last,
+            "min_id": min_id,
+            "max_id": max_id,
+            "actions": actions,
+            "bytes": os.path.getsize(path),
+            "sha256": digest.hexdigest(),
+            "archived_at": datetime.utcnow().isoformat(),
+            "deleted": False,
+        }
+
+    def _delete_segment_rows(self, segment: dict) -> int:
+        """
+        Deletes the segment's rows (its day, id <= max_id) in short batches.
+        """
+        if segment["max_id"] is None:
+            return 0
+        day = datetime.fromisoformat(segment["day"])
+        batch = (
+            select(AuditLog.id)
+            .where(AuditLog.timestamp >= day, AuditLog.timestamp < day + timedelta(days=1),
+                   AuditLog.id <= segment["max_id"])
+            .limit(self.batch_size)
+        )
+        deleted = 0
+        while True:
+            with self._engine.begin() as conn:
+                count = conn.execute(delete(AuditLog).where(AuditLog.id.in_(batch))).rowcount
+            deleted += count
+            if count < self.batch_size:
+                return deleted
+
+    # --- Reads ---
+
+    def _candidates(self, filters: AuditLogFilters, before: Optional[Key], after: Optional[Key]) -> List[dict]:
+        """
+        Segments that may hold rows with after < key < before matching the filters, newest first.
+        """
+        since = naive_utc(filters.since) if filters.since else None
+        until = naive_utc(filters.until) if filters.until else None
+        found = []
+        for segment in self.segments():
+            if not segment["rows"]:
+                continue
+            first = datetime.fromisoformat(segment["first"])
+            last = datetime.fromisoformat(segment["last"])
+            if ((before and (first, segment["min_id"]) >= before)
+                    or (after and (last, segment["max_id"]) <= after)
+                    or (since and last < since) or (until and first >= until)
+                    or (filters.action_type is not None and filters.action_type not in segment["actions"])):
+                continue
+            found.append(segment)
+        return sorted(found, key=lambda s: (s["last"], s["max_id"]), reverse=True)
+
+    def has_candidates(self, filters: AuditLogFilters, before: Optional[Key] = None, after: Optional[Key] = None) -> bool:
+        return bool(self._candidates(filters, before, after))
+
+    def page(self, filters: AuditLogFilters, before: Optional[Key], limit: int,
+             after: Optional[Key] = None) -> List[AuditLogResponse]:
+        """
+        Up to limit + 1 archived rows, newest first, with after < (timestamp, id) < before.
+        Reading a segment costs a full decompression of its day.
+        """
+        since = naive_utc(filters.since) if filters.since else None
+        until = naive_utc(filters.until) if filters.until else None
+        best: List[Tuple[Key, dict]] = []  # min-heap of the limit + 1 newest keys seen
+        for segment in self._candidates(filters, before, after):
+            if len(best) > limit and (datetime.fromisoformat(segment["last"]), segment["max_id"]) < best[0][0]:
+                break  # this and every older segment only hold older rows
+            for row in self._read_segment(segment):
+                key = (row["timestamp"], row["id"])
+                if ((before and key >= before) or (after and key <= after)
+                        or (since and key[0] < since) or (until and key[0] >= until)
+                        or not _matches(row, filters)):
+                    continue
+                if len(best) <= limit:
+                    heapq.heappush(best, (key, row))
+                elif key > best[0][0]:
+                    heapq.heapreplace(best, (key, row))
+        best.sort(key=lambda item: item[0], reverse=True)
+        return [AuditLogResponse(**row) for _, row in best]
+
+    def _read_segment(self, segment: dict) -> Iterator[dict]:
+        with gzip.open(os.path.join(self.directory, segment["file"]), "rt", encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+                yield row
+
+    def iter_rows(self, filters: AuditLogFilters) -> Iterator[dict]:
+        """
+        Every archived row matching the filters, oldest first. Segments are streamed line by
+        line; the parts of one day are merged.
+        """
+        since = naive_utc(filters.since) if filters.since else None
+        until = naive_utc(filters.until) if filters.until else None
+        segments = sorted(self._candidates(filters, None, None), key=lambda s: (s["day"], s["part"]))
+        for _, parts in itertools.groupby(segments, key=lambda s: s["day"]):
+            rows = heapq.merge(*(self._read_segment(s) for s in parts), key=lambda r: (r["timestamp"], r["id"]))
+            for row in rows:
+                if ((since and row["timestamp"] < since) or (until and row["timestamp"] >= until)
+                        or not _matches(row, filters)):
+                    continue
+                yield row
+
+    def pending_deletes(self) -> List[Tuple[datetime, int]]:
+        """
+        (day, max_id) of segments whose rows may still be in audit_logs.
+        """
+        return [(datetime.fromisoformat(s["day"]), s["max_id"]) for s in self.segments()
+                if not s["deleted"] and s["max_id"] is not None]
+
+    # --- Scheduler ---
+
+    def start(self):
+        if self.retention_days <= 0 or self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                self.run()
+            except RetentionBusyError:
+                pass
+            except Exception as e:
+                logger.error(f"Audit retention failed: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+
+def merge_pages(hot: list, archived: List[AuditLogResponse], limit: int) -> list:
+    """
+    Newest limit + 1 rows of both sources. A row archived but not yet deleted appears once.
+    """
+    merged = {row_key(row): row for row in archived}
+    merged.update((row_key(row), row) for row in hot)
+    return [merged[key] for key in sorted(merged, reverse=True)[:limit + 1]]
+
+
+audit_archive = AuditArchive(
+    settings.AUDIT_ARCHIVE_DIR,
+    retention_days=settings.AUDIT_RETENTION_DAYS,
+    batch_size=settings.AUDIT_RETENTION_BATCH_SIZE,
+    interval=settings.AUDIT_RETENTION_INTERVAL_SECONDS,
+)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if audit_archive.retention_days <= 0:
+        raise SystemExit("AUDIT_RETENTION_DAYS no está configurado (0 = retención desactivada)")
+    print(audit_archive.run())
@@ -0,0 +1,105 @@
+"""
+Audit Log Export (Admin Console).
+Streams the whole audit history matching the audit_query filters as CSV or NDJSON, oldest
+first, optionally gzip-compressed, for compliance pulls of months of events.
+
+audit_logs is read in keyset chunks of AUDIT_EXPORT_CHUNK_ROWS rows: each chunk is one short
+read on the (timestamp, id) index and the connection goes back to the pool before the chunk
+is sent, so a slow client never keeps a transaction (or SQLite's shared lock) open and memory
+stays at one chunk plus one output buffer. Archived days (audit_archive.py) are merged in
+from their segments.
+"""
+import csv
+import heapq
+import io
+import json
+import zlib
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional, Tuple
+
+from audit_archive import COLUMNS, audit_archive, naive_utc
+from audit_query import AuditLogFilters, audit_log_export_query
+from database import engine
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+FLUSH_BYTES = 64 * 1024
+
+
+def _row_key(row: dict) -> Tuple[datetime, int]:
+    return row["timestamp"], row["id"]
+
+
+def iter_hot_rows(filters: AuditLogFilters, chunk_size: int, bind=engine) -> Iterator[dict]:
+    """
+    audit_logs rows matching the filters, oldest first, one short query per chunk.
+    """
+    after: Optional[Tuple[datetime, int]] = None
+    while True:
+        with bind.connect() as conn:
+            rows = conn.execute(audit_log_export_query(filters, after, chunk_size)).mappings().all()
+        for row in rows:
+            record = dict(row)
+            record["timestamp"] = naive_utc(record["timestamp"])
+            yield record
+        if len(rows) < chunk_size:
+            return
+        after = (rows[-1]["timestamp"], rows[-1]["id"])
+
+
+def iter_audit_rows(filters: AuditLogFilters, chunk_size: int, bind=engine, archive=audit_archive) -> Iterator[dict]:
+    """
+    Archived and hot rows merged on (timestamp, id). Rows of a segment whose delete has not
+    finished yet come from the segment only.
+    """
+    pending = archive.pending_deletes()
+
+    def not_archived(row: dict) -> bool:
+        return not any(day <= row["timestamp"] < day + timedelta(days=1) and row["id"] <= max_id
+                       for day, max_id in pending)
+
+    hot = iter_hot_rows(filters, chunk_size, bind)
+    if pending:
+        hot = filter(not_archived, hot)
+    return heapq.merge(archive.iter_rows(filters), hot, key=_row_key)
+
+
+def encode_rows(rows: Iterable[dict], export_format: str, compress: bool = False) -> Iterator[bytes]:
+    """
+    CSV (with header) or NDJSON, in chunks of about FLUSH_BYTES, gzip-framed when `compress`.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip container
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == "csv" else None
+
+    def take() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    if writer:
+        writer.writerow(COLUMNS)
+    for row in rows:
+        if writer:
+            writer.writerow([row["timestamp"].isoformat() if column == "timestamp" else row[column] for column in COLUMNS])
+        else:
+            record = {column: row[column] for column in COLUMNS}
+            record["timestamp"] = row["timestamp"].isoformat()
+            buffer.write(json.dumps(record, separators=(",", ":")) + "\n")
+        if buffer.tell() >= FLUSH_BYTES:
+            chunk = take()
+            if chunk:
+                yield chunk
+
+    chunk = take()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def export_filename(export_format: str, compress: bool, at: datetime) -> str:
+    return f"audit-logs-{at.strftime('%Y%m%dT%H%M%SZ')}.{export_format}{'.gz' if compress else ''}"
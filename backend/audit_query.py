@@ -0,0 +1,78 @@
+"""
+Audit Log Query (Admin Console).
+Keyset pagination over audit_logs, newest first, ordered by (timestamp, id). A page continues
+strictly after the last row of the previous one, `(timestamp, id) < cursor`, so any page costs
+one index range scan instead of OFFSET's skip over every earlier row. Filters use the
+composite indexes (actor_id | action_type | target_id, timestamp, id) declared on AuditLog.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import Select, select, tuple_
+
+from models import AuditLog
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class AuditLogFilters:
+    actor_id: Optional[str] = None
+    action_type: Optional[str] = None
+    target_id: Optional[str] = None
+    since: Optional[datetime] = None  # inclusive
+    until: Optional[datetime] = None  # exclusive
+
+
+def encode_cursor(timestamp: datetime, log_id: int) -> str:
+    raw = json.dumps({"t": timestamp.isoformat(), "id": log_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["t"]), int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursorError("Cursor inválido")
+
+
+def apply_filters(query: Select, filters: AuditLogFilters) -> Select:
+    if filters.actor_id is not None:
+        query = query.where(AuditLog.actor_id == filters.actor_id)
+    if filters.action_type is not None:
+        query = query.where(AuditLog.action_type == filters.action_type)
+    if filters.target_id is not None:
+        query = query.where(AuditLog.target_id == filters.target_id)
+    if filters.since is not None:
+        query = query.where(AuditLog.timestamp >= filters.since)
+    if filters.until is not None:
+        query = query.where(AuditLog.timestamp < filters.until)
+    return query
+
+
+def audit_log_page_query(filters: AuditLogFilters, cursor: Optional[str], limit: int) -> Select:
+    """
+    One page, newest first. Fetches limit + 1 rows: the extra one only says whether there is a next page.
+    """
+    query = apply_filters(select(AuditLog), filters)
+    if cursor:
+        timestamp, log_id = decode_cursor(cursor)
+        query = query.where(tuple_(AuditLog.timestamp, AuditLog.id) < tuple_(timestamp, log_id))
+    return query.order_by(AuditLog.timestamp.desc(), AuditLog.id.desc()).limit(limit + 1)
+
+
+def audit_log_export_query(filters: AuditLogFilters, after: Optional[Tuple[datetime, int]], limit: int) -> Select:
+    """
+    One export chunk, oldest first, strictly after the last row of the previous chunk.
+    """
+    query = apply_filters(select(AuditLog.__table__), filters)
+    if after:
+        query = query.where(tuple_(AuditLog.timestamp, AuditLog.id) > tuple_(*after))
+    return query.order_by(AuditLog.timestamp, AuditLog.id).limit(limit)
@@ -0,0 +1,95 @@
+"""
+Audit Rollups (Admin Console).
+Event counts per (action_type, UTC hour) and per (actor, UTC day, action_type), updated by the
+audit writer in the same transaction that inserts the batch: the batch is counted in memory and
+added with one executemany upsert per table. Dashboard charts read these tables, so they cost
+O(buckets) whatever the size of audit_logs, and keep counting days the retention job archived.
+
+History written before the tables existed (or after editing audit_logs by hand):
+    python audit_rollups.py --rebuild
+rebuilds both tables from audit_logs and the archive. Run it with the API stopped.
+"""
+import argparse
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+from database import engine
+from models import AuditActorDailyCount, AuditHourlyCount
+
+hourly_table = AuditHourlyCount.__table__
+actor_daily_table = AuditActorDailyCount.__table__
+SYSTEM_ACTOR = ""
+
+
+def hour_bucket(timestamp: datetime) -> datetime:
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def count_rows(rows: Iterable[dict]) -> Tuple[Counter, Counter]:
+    """
+    (action_type, hour) and (actor_id, day, action_type) counts of audit rows.
+    """
+    hourly, actor_daily = Counter(), Counter()
+    for row in rows:
+        timestamp = row["timestamp"]
+        hourly[(row["action_type"], hour_bucket(timestamp))] += 1
+        actor_daily[(row["actor_id"] or SYSTEM_ACTOR, timestamp.date(), row["action_type"])] += 1
+    return hourly, actor_daily
+
+
+def _upsert(conn, table, keys: Tuple[str, ...], counts: Counter):
+    dialect_insert = postgresql.insert if conn.dialect.name == "postgresql" else sqlite.insert
+    statement = dialect_insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={"count": table.c.count + statement.excluded["count"]},
+    )
+    # Same key order in every worker: concurrent upserts never wait on each other in a cycle
+    conn.execute(statement, [{**dict(zip(keys, key)), "count": n} for key, n in sorted(counts.items())])
+
+
+def add_to_rollups(conn, rows: List[dict]):
+    """
+    Adds a batch of audit rows to both rollups, inside the caller's transaction.
+    """
+    hourly, actor_daily = count_rows(rows)
+    if hourly:
+        _upsert(conn, hourly_table, ("action_type", "bucket"), hourly)
+        _upsert(conn, actor_daily_table, ("actor_id", "day", "action_type"), actor_daily)
+
+
+def rebuild_rollups(bind=engine, chunk_size: int = 5000) -> Tuple[int, int]:
+    """
+    Recounts every audit row (audit_logs + archive) and replaces both rollups in one transaction.
+    """
+    from audit_export import iter_audit_rows
+    from audit_query import AuditLogFilters
+
+    hourly, actor_daily = count_rows(iter_audit_rows(AuditLogFilters(), chunk_size, bind))
+    with bind.begin() as conn:
+        conn.execute(delete(hourly_table))
+        conn.execute(delete(actor_daily_table))
+        if hourly:
+            conn.execute(insert(hourly_table), [
+                {"action_type": action_type, "bucket": bucket, "count": n}
+                for (action_type, bucket), n in hourly.items()
+            ])
+            conn.execute(insert(actor_daily_table), [
+                {"actor_id": actor_id, "day": day, "action_type": action_type, "count": n}
+                for (actor_id, day, action_type), n in actor_daily.items()
+            ])
+    return len(hourly), len(actor_daily)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rollups de auditoría")
+    parser.add_argument("--rebuild", action="store_true", help="Recalcula las tablas desde audit_logs y el archivo")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.error("Nada que hacer: usa --rebuild")
+    hourly_rows, actor_rows = rebuild_rollups()
+    print(f"✅ Rollups reconstruidos: {hourly_rows} buckets horarios, {actor_rows} buckets actor/día")
@@ -0,0 +1,176 @@
+"""
+Principal Cache (Auth).
+In-process LRU + TTL cache of what get_current_user needs to authorize a request:
+user_id -> token_version, is_active, role names. Steady-state authentication costs
+no database queries; any write to a user drops its entry so revocation stays immediate.
+Admin endpoints publish invalidations on the bus so every worker drops the entry.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import selectinload
+
+from config import settings
+from database import SessionLocal
+from invalidation_bus import invalidation_bus
+from models import User
+
+CHANNEL_PRINCIPALS = "principals"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Immutable, session-free snapshot of an authenticated user.
+    """
+    id: str
+    email: str
+    full_name: str
+    token_version: int
+    is_active: bool
+    roles: Tuple[str, ...]
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            token_version=user.token_version,
+            is_active=bool(user.is_active),
+            roles=tuple(role.name for role in user.roles),
+        )
+
+
+def load_principal(user_id: str) -> Optional[Principal]:
+    """
+    One round trip: the user row plus its role names.
+    """
+    db = SessionLocal()
+    try:
+        user = db.query(User).options(selectinload(User.roles)).filter(User.id == user_id).first()
+        return Principal.from_user(user) if user else None
+    finally:
+        db.close()
+
+
+class PrincipalCache:
+    """
+    Thread-safe LRU + TTL cache of Principal objects keyed by user id.
+    """
+
+    def __init__(self, loader: Callable[[str], Optional[Principal]] = load_principal,
+                 max_entries: int = 10000, ttl_seconds: float = 60):
+        self._loader = loader
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation: a load that raced with one is not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id: str) -> Optional[Principal]:
+        """
+        Cached principal, loaded from the database on a miss. None if the user does not exist.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        principal = self._loader(user_id)
+        if principal is None:
+            return None
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[user_id] = (time.monotonic() + self.ttl_seconds, principal)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return principal
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generation += 1
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.AUTH_CACHE_SIZE,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+
+def _on_principal_invalidation(user_id: Optional[str]):
+    if user_id is None:
+        principal_cache.clear()
+    else:
+        principal_cache.invalidate(user_id)
+
+
+invalidation_bus.subscribe(CHANNEL_PRINCIPALS, _on_principal_invalidation)
+
+
+def invalidate_principal(user_id: str):
+    """
+    Drops a user's cached principal in this worker and every other one.
+    Call after the change is committed.
+    """
+    invalidation_bus.publish(CHANNEL_PRINCIPALS, user_id)
+
+
+# --- INVALIDATION ON WRITE ---
+# Routes publish explicitly after their commit (all workers); these listeners are the
+# in-process safety net for any other committed User write in this process.
+
+@event.listens_for(SessionLocal, "before_flush")
+def _track_user_writes(session, flush_context, instances):
+    changed = session.info.setdefault("users_changed", set())
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.id)
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_on_commit(session):
+    for user_id in session.info.pop("users_changed", ()):
+        principal_cache.invalidate(user_id)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _reset_on_rollback(session):
+    session.info.pop("users_changed", None)
@@ -0,0 +1,239 @@
+"""
+Benchmark: sync vs async database path (Auth / Admin Console).
+Sirve la misma consulta por dos rutas de una app FastAPI mínima:
+
+  sync   -> def + SessionLocal (psycopg2 / sqlite3): cada petición ocupa un hilo del threadpool
+  async  -> async def + AsyncSessionLocal (asyncpg / aiosqlite): la espera no ocupa ningún hilo
+
+y las dispara en proceso (httpx + ASGITransport, sin red) a varios niveles de concurrencia.
+Casos: `users` (lo que hace GET /admin/users: usuarios + roles) y `audit` (GET /admin/audit-logs).
+--db-latency-ms añade a cada petición un round trip simulado (pg_sleep en Postgres, una función
+registrada en SQLite), que es donde el threadpool se convierte en el cuello de botella.
+
+Uso (desde backend/):
+    python benchmarks/bench_async_db.py --output bench_async_db.json
+    python benchmarks/bench_async_db.py --quick --db-latency-ms 5
+    DATABASE_URL=postgresql://... python benchmarks/bench_async_db.py --no-seed
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'nexo_bench_db.db')}")
+
+import httpx
+import numpy as np
+from fastapi import Depends, FastAPI
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from database import Base, SessionLocal, async_engine, engine, get_async_db, get_db
+from models import AuditLog, Role, User
+
+SEED_USERS = 200
+SEED_AUDIT_LOGS = 2000
+AUDIT_PAGE = 100
+
+
+def seed():
+    """
+    Base de datos desechable: SEED_USERS usuarios con 1-2 roles y SEED_AUDIT_LOGS eventos.
+    """
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        roles = [Role(name=name) for name in ("Admin", "Academico", "Colaborador")]
+        db.add_all(roles)
+        users = []
+        for i in range(SEED_USERS):
+            users.append(User(
+                email=f"user{i:04d}@bench.nexo", full_name=f"Bench User {i}", password_hash="x",
+                roles=roles[1:] if i % 3 == 0 else [roles[1 + i % 2]],
+            ))
+        db.add_all(users)
+        db.flush()
+        db.add_all(AuditLog(actor_id=users[i % SEED_USERS].id, action_type="LOGIN", details="{}")
+                   for i in range(SEED_AUDIT_LOGS))
+        db.commit()
+    finally:
+        db.close()
+
+
+def round_trip_sql(latency_ms: float):
+    if latency_ms <= 0:
+        return None
+    if engine.dialect.name == "postgresql":
+        return text(f"SELECT pg_sleep({latency_ms / 1000})")
+    return text(f"SELECT nexo_sleep({latency_ms / 1000})")
+
+
+def register_sqlite_sleep():
+    # Runs in the driver's thread (sqlite3 in the request thread, aiosqlite in its own)
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.create_function("nexo_sleep", 1, lambda seconds: time.sleep(seconds) or 0)
+    event.listen(engine, "connect", on_connect)
+    event.listen(async_engine.sync_engine, "connect", on_connect)
+
+
+def build_app(latency_ms: float) -> FastAPI:
+    """
+    Las dos variantes de cada consulta, idénticas salvo por el driver y el modelo de ejecución.
+    """
+    app = FastAPI()
+    delay = round_trip_sql(latency_ms)
+
+    def users_query():
+        return select(User).options(selectinload(User.roles)).order_by(User.email)
+
+    def audit_query():
+        return select(AuditLog).order_by(AuditLog.timestamp.desc(), AuditLog.id.desc()).limit(AUDIT_PAGE)
+
+    def serialize_users(users):
+        return [{"id": u.id, "email": u.email, "roles": [r.name for r in u.roles]} for u in users]
+
+    def serialize_logs(logs):
+        return [{"id": log.id, "action_type": log.action_type, "actor_id": log.actor_id} for log in logs]
+
+    @app.get("/sync/users")
+    def sync_users(db: Session = Depends(get_db)):
+        if delay is not None:
+            db.execute(delay)
+        return serialize_users(db.execute(users_query()).scalars().all())
+
+    @app.get("/async/users")
+    async def async_users(db: AsyncSession = Depends(get_async_db)):
+        if delay is not None:
+            await db.execute(delay)
+        return serialize_users((await db.execute(users_query())).scalars().all())
+
+    @app.get("/sync/audit")
+    def sync_audit(db: Session = Depends(get_db)):
+        if delay is not None:
+            db.execute(delay)
+        return serialize_logs(db.execute(audit_query()).scalars().all())
+
+    @app.get("/async/audit")
+    async def async_audit(db: AsyncSession = Depends(get_async_db)):
+        if delay is not None:
+            await db.execute(delay)
+        return serialize_logs((await db.execute(audit_query())).scalars().all())
+
+    return app
+
+
+async def drive(client: httpx.AsyncClient, path: str, requests: int, concurrency: int) -> dict:
+    """
+    `requests` peticiones a `path` con `concurrency` clientes en paralelo.
+    """
+    samples = np.empty(requests)
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < requests:
+            i = next_index
+            next_index += 1
+            started = time.perf_counter()
+            response = await client.get(path)
+            samples[i] = time.perf_counter() - started
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "req_per_sec": round(requests / elapsed, 2),
+        "p50_ms": round(float(np.percentile(samples, 50)) * 1000, 3),
+        "p99_ms": round(float(np.percentile(samples, 99)) * 1000, 3),
+    }
+
+
+async def run(args) -> list:
+    app = build_app(args.db_latency_ms)
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for case in ("users", "audit"):
+            for concurrency in args.concurrency:
+                for mode in ("sync", "async"):
+                    path = f"/{mode}/{case}"
+                    await drive(client, path, min(args.requests, 20), min(concurrency, 4))  # warmup
+                    stats = await drive(client, path, args.requests, concurrency)
+                    result = {"name": f"{case}/{mode}/c{concurrency}", "case": case, "mode": mode,
+                              "concurrency": concurrency, **stats}
+                    results.append(result)
+                    print(f"{result['name']:<20} {stats['req_per_sec']:>10,.0f} req/s   "
+                          f"p50 {stats['p50_ms']:>9.2f} ms   p99 {stats['p99_ms']:>9.2f} ms"
+                          + (f"   errors {stats['errors']}" if stats["errors"] else ""))
+    return results
+
+
+def speedups(results) -> dict:
+    by_name = {r["name"]: r for r in results}
+    ratios = {}
+    for r in results:
+        if r["mode"] == "async":
+            sync = by_name[f"{r['case']}/sync/c{r['concurrency']}"]
+            ratios[f"{r['case']}/c{r['concurrency']}"] = round(r["req_per_sec"] / sync["req_per_sec"], 3)
+    return ratios
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async del acceso a base de datos")
+    parser.add_argument("--output", default="bench_async_db.json", help="Fichero JSON de resultados")
+    parser.add_argument("--quick", action="store_true", help="Menos casos y peticiones (CI)")
+    parser.add_argument("--requests", type=int, default=None, help="Peticiones medidas por caso")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=None, help="Niveles de concurrencia")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0,
+                        help="Round trip simulado por petición (ms)")
+    parser.add_argument("--no-seed", action="store_true",
+                        help="No recrear ni poblar las tablas (base de datos ya preparada)")
+    args = parser.parse_args()
+    args.requests = args.requests or (200 if args.quick else 1000)
+    args.concurrency = args.concurrency or ([1, 32] if args.quick else [1, 8, 32, 128])
+
+    if engine.dialect.name == "sqlite":
+        register_sqlite_sleep()
+    if not args.no_seed:
+        if engine.dialect.name != "sqlite":
+            parser.error("--no-seed es obligatorio fuera de SQLite: el seed borra las tablas")
+        seed()
+
+    results = asyncio.run(run(args))
+    ratios = speedups(results)
+    print("\nasync / sync (req/s): " + ", ".join(f"{k} x{v}" for k, v in ratios.items()))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "dialect": engine.dialect.name,
+            "db_latency_ms": args.db_latency_ms,
+            "quick": args.quick,
+        },
+        "results": results,
+        "async_speedup": ratios,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResultados escritos en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
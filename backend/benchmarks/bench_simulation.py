@@ -0,0 +1,227 @@
+"""
+Benchmark del Motor de Simulación (Pyrolysis Hub).
+Mide en proceso (sin servidor ni base de datos) las tres rutas del kernel:
+
+  single  -> pyrolysis_engine.simulate_one (lo que ejecuta /api/simulate en un miss de caché)
+  batch   -> pyrolysis_engine.simulate_batch (/api/simulate/batch)
+  sweep   -> simulation_sweep.run_chunk (un bloque de /api/simulate/sweep)
+
+sobre un catálogo sintético, a varios tamaños de mezcla y de lote. Reporta ops/s y
+latencias p50/p99 por caso y escribe los resultados en JSON. Con --baseline compara
+contra una ejecución anterior y termina con código 1 si algún caso pierde más de
+--max-regression de throughput.
+
+Uso (desde backend/):
+    python benchmarks/bench_simulation.py --output bench.json
+    python benchmarks/bench_simulation.py --quick --baseline bench.json --max-regression 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# material_catalog opens a session factory on import: keep it away from the real database
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'nexo_bench.db')}")
+
+import numpy as np
+
+from material_catalog import CatalogSnapshot
+from pyrolysis_engine import PROPERTY_COLUMNS, mode_code, simulate_batch, simulate_one
+from schemas import SimulationRequest
+from simulation_sweep import run_chunk, simplex_grid
+
+CATALOG_SIZE = 64
+MODES = ("FAST", "SLOW", "FLASH")
+ATMOSPHERES = ("N2", "STEAM")
+
+
+def synthetic_catalog(n_materials: int, seed: int = 7) -> CatalogSnapshot:
+    """
+    Catálogo con composiciones realistas (C/H/O/N, trazas de S/Cl, ceniza y humedad).
+    """
+    rng = np.random.default_rng(seed)
+    properties = np.column_stack([
+        rng.uniform(40, 85, n_materials),    # c
+        rng.uniform(4, 14, n_materials),     # h
+        rng.uniform(0, 45, n_materials),     # o
+        rng.uniform(0, 2, n_materials),      # n
+        rng.uniform(0, 0.8, n_materials),    # s
+        rng.uniform(0, 0.3, n_materials),    # cl
+        rng.uniform(0, 15, n_materials),     # ash
+        rng.uniform(0, 30, n_materials),     # moisture
+    ])
+    assert properties.shape[1] == len(PROPERTY_COLUMNS)
+    index = {f"MAT-{i:03d}": i for i in range(n_materials)}
+    return CatalogSnapshot(version=0, properties=properties, index=index, materials=[])
+
+
+def random_requests(catalog: CatalogSnapshot, count: int, mixture_size: int, seed: int = 11):
+    rng = np.random.default_rng(seed)
+    ids = list(catalog.index)
+    requests = []
+    for _ in range(count):
+        chosen = rng.choice(len(ids), size=mixture_size, replace=False)
+        percents = rng.dirichlet(np.ones(mixture_size)) * 100
+        requests.append(SimulationRequest(
+            mixture=[{"id": ids[j], "percent": float(p)} for j, p in zip(chosen, percents)],
+            reactorType="FIXED_BED",
+            pyrolysisMode=MODES[rng.integers(len(MODES))],
+            atmosphere=ATMOSPHERES[rng.integers(len(ATMOSPHERES))],
+            residenceTime=float(rng.uniform(0.5, 30)),
+        ))
+    return requests
+
+
+def measure(fn, calls: int, items_per_call: int, warmup: int) -> dict:
+    """
+    Times `calls` invocations of fn(i); ops/s counts items (scenarios or grid points).
+    """
+    for i in range(warmup):
+        fn(i)
+    samples = np.empty(calls)
+    for i in range(calls):
+        started = time.perf_counter()
+        fn(i)
+        samples[i] = time.perf_counter() - started
+    total = samples.sum()
+    return {
+        "calls": calls,
+        "items_per_call": items_per_call,
+        "ops_per_sec": round(calls * items_per_call / total, 2) if total > 0 else None,
+        "mean_ms": round(samples.mean() * 1000, 4),
+        "p50_ms": round(float(np.percentile(samples, 50)) * 1000, 4),
+        "p99_ms": round(float(np.percentile(samples, 99)) * 1000, 4),
+    }
+
+
+def bench_single(catalog, mixture_sizes, calls, warmup):
+    results = []
+    for size in mixture_sizes:
+        pool = random_requests(catalog, 256, size)
+        stats = measure(lambda i: simulate_one(pool[i % len(pool)], catalog.properties, catalog.index),
+                        calls, 1, warmup)
+        results.append({"name": f"single/mix{size}", "path": "single", "mixture_size": size, **stats})
+    return results
+
+
+def bench_batch(catalog, mixture_sizes, batch_sizes, calls, warmup):
+    results = []
+    for size in mixture_sizes:
+        for batch in batch_sizes:
+            requests = random_requests(catalog, batch, size)
+            # Large batches are slow per call: scale the call count down to keep runs bounded
+            n_calls = max(3, min(calls, calls * 100 // batch))
+            stats = measure(lambda i: simulate_batch(requests, catalog.properties, catalog.index),
+                            n_calls, batch, min(warmup, 2))
+            results.append({"name": f"batch/mix{size}/n{batch}", "path": "batch",
+                            "mixture_size": size, "batch_size": batch, **stats})
+    return results
+
+
+def bench_sweep(catalog, grids, calls, warmup):
+    results = []
+    residence = np.array([0.5, 1.0, 2.0, 5.0, 10.0, 30.0])
+    modes = np.array([mode_code(m) for m in MODES], dtype=np.int8)
+    steam = np.array([False, True])
+    for n_materials, step in grids:
+        properties = catalog.properties[:n_materials]
+        fractions = simplex_grid(n_materials, step)
+        points = len(residence) * len(modes) * len(steam) * len(fractions)
+        stats = measure(lambda i: run_chunk(properties, fractions, modes, steam, residence, 0, points),
+                        max(3, calls // 10), points, min(warmup, 2))
+        results.append({"name": f"sweep/mix{n_materials}/step{step:g}", "path": "sweep",
+                        "mixture_size": n_materials, "grid_points": points, **stats})
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def compare(results, baseline_path: str, max_regression: float) -> list:
+    """
+    Cases whose ops/s dropped by more than max_regression (fraction) against the baseline.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["name"])
+        if not previous or not previous.get("ops_per_sec") or not result.get("ops_per_sec"):
+            continue
+        change = result["ops_per_sec"] / previous["ops_per_sec"] - 1
+        result["baseline_ops_per_sec"] = previous["ops_per_sec"]
+        result["change"] = round(change, 4)
+        if change < -max_regression:
+            regressions.append(result)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del kernel de simulación de pirólisis")
+    parser.add_argument("--output", default="bench_simulation.json", help="Fichero JSON de resultados")
+    parser.add_argument("--quick", action="store_true", help="Menos casos y repeticiones (CI)")
+    parser.add_argument("--calls", type=int, default=None, help="Llamadas medidas por caso")
+    parser.add_argument("--baseline", help="JSON de una ejecución anterior para comparar")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Pérdida de ops/s tolerada frente al baseline (fracción)")
+    args = parser.parse_args()
+
+    if args.quick:
+        mixture_sizes, batch_sizes, grids = (2, 5), (1, 100, 1000), ((3, 10), (4, 10))
+        calls, warmup = args.calls or 50, 5
+    else:
+        mixture_sizes, batch_sizes, grids = (1, 2, 5, 10), (1, 10, 100, 1000, 10000), ((3, 5), (4, 5), (6, 10))
+        calls, warmup = args.calls or 300, 20
+
+    catalog = synthetic_catalog(CATALOG_SIZE)
+    results = []
+    for section in (
+        lambda: bench_single(catalog, mixture_sizes, calls, warmup),
+        lambda: bench_batch(catalog, (2, 10) if not args.quick else (5,), batch_sizes, calls, warmup),
+        lambda: bench_sweep(catalog, grids, calls, warmup),
+    ):
+        for result in section():
+            results.append(result)
+            print(f"{result['name']:<24} {result['ops_per_sec']:>14,.0f} ops/s   "
+                  f"p50 {result['p50_ms']:>9.3f} ms   p99 {result['p99_ms']:>9.3f} ms")
+
+    regressions = compare(results, args.baseline, args.max_regression) if args.baseline else []
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": args.quick,
+            "catalog_size": CATALOG_SIZE,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResultados escritos en {args.output}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} caso(s) con regresión > {args.max_regression:.0%}:")
+        for r in regressions:
+            print(f"   {r['name']}: {r['baseline_ops_per_sec']:,.0f} -> {r['ops_per_sec']:,.0f} ops/s ({r['change']:+.1%})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Load test of the authentication flow (Auth).
+Starts the API locally (uvicorn) over a throwaway SQLite database seeded with init_db.py plus
+--users load users, and drives it with concurrent virtual users:
+
+  login      -> POST /auth/login (each virtual user logs in again every --relogin-every requests)
+  protected  -> GET of every --protected route with the bearer token
+  revoke     -> POST /admin/revoke-user-tokens/{email} from one admin client every --revoke-interval s
+
+A virtual user whose token was revoked gets a 401, logs in again and carries on: those 401s
+are expected and reported apart ("revoked"), not as errors. Throughput, p50/p95/p99 latency
+and error rate are reported per route and written as JSON.
+
+Uso (desde backend/):
+    python benchmarks/load_auth.py --concurrency 32 --duration 30 --output load_auth.json
+    python benchmarks/load_auth.py --workers 4 --revoke-interval 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="nexo_load_"), "load.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, BACKEND_DIR)
+
+import httpx
+import numpy as np
+
+ADMIN = ("admin@nexo.com", "admin123")
+LOAD_PASSWORD = "carga123"
+LOGIN_ROUTE = "POST /auth/login"
+REVOKE_ROUTE = "POST /admin/revoke-user-tokens/{email}"
+
+
+def load_email(i: int) -> str:
+    return f"load{i:04d}@nexo.com"
+
+
+def seed(users: int):
+    """
+    init_db.py (roles, demo users, materials) plus `users` Academico accounts sharing one
+    password hash: bcrypt once, not once per account.
+    """
+    subprocess.run([sys.executable, "init_db.py"], cwd=BACKEND_DIR, check=True, capture_output=True,
+                   env={**os.environ})
+
+    from sqlalchemy import insert, select
+    from database import SessionLocal
+    from models import Role, User, user_roles
+    from security import get_password_hash
+
+    password_hash = get_password_hash(LOAD_PASSWORD)
+    db = SessionLocal()
+    try:
+        role_id = db.execute(select(Role.id).where(Role.name == "Academico")).scalar_one()
+        rows = [{"id": f"load-{i:04d}", "email": load_email(i), "full_name": f"Load User {i}",
+                 "password_hash": password_hash, "is_active": True, "token_version": 1} for i in range(users)]
+        db.execute(insert(User), rows)
+        db.execute(insert(user_roles), [{"user_id": row["id"], "role_id": role_id} for row in rows])
+        db.commit()
+    finally:
+        db.close()
+
+
+def start_server(port: int, workers: int):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env={**os.environ},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    for _ in range(120):
+        try:
+            httpx.get(f"http://localhost:{port}/", timeout=1)
+            return server
+        except httpx.TransportError:
+            if server.poll() is not None:
+                break
+            time.sleep(1)
+    server.terminate()
+    raise RuntimeError("El servidor no arrancó")
+
+
+class Recorder:
+    """
+    Latencies and outcomes per route, only for requests that start inside the measuring window.
+    """
+
+    def __init__(self, measure_from: float):
+        self.measure_from = measure_from
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.revoked = defaultdict(int)
+        self.errors = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, route: str, method: str, url: str, expect_revocation=False, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        if started < self.measure_from:
+            return response
+        self.latencies[route].append(time.perf_counter() - started)
+        status = response.status_code if response is not None else "connection_error"
+        self.statuses[route][status] += 1
+        if response is not None and response.status_code == 401 and expect_revocation:
+            self.revoked[route] += 1
+        elif response is None or response.status_code >= 400:
+            self.errors[route] += 1
+        return response
+
+    def report(self, elapsed: float):
+        results = []
+        for route, samples in sorted(self.latencies.items()):
+            samples = np.array(samples)
+            results.append({
+                "route": route,
+                "requests": len(samples),
+                "req_per_sec": round(len(samples) / elapsed, 2),
+                "p50_ms": round(float(np.percentile(samples, 50)) * 1000, 2),
+                "p95_ms": round(float(np.percentile(samples, 95)) * 1000, 2),
+                "p99_ms": round(float(np.percentile(samples, 99)) * 1000, 2),
+                "error_rate": round(self.errors[route] / len(samples), 4),
+                "revoked": self.revoked[route],
+                "statuses": {str(k): v for k, v in sorted(self.statuses[route].items(), key=str)},
+            })
+        return results
+
+
+async def virtual_user(client, recorder, email, protected, relogin_every, deadline):
+    token = None
+    served = 0
+    while time.perf_counter() < deadline:
+        if token is None or served >= relogin_every:
+            response = await recorder.request(client, LOGIN_ROUTE, "POST", "/auth/login",
+                                              json={"email": email, "password": LOAD_PASSWORD})
+            served = 0
+            if response is None or response.status_code != 200:
+                await asyncio.sleep(0.05)  # 503 under bcrypt pressure: back off a little
+                continue
+            token = response.json()["access_token"]
+
+        for path in protected:
+            response = await recorder.request(client, f"GET {path}", "GET", path, expect_revocation=True,
+                                              headers={"Authorization": f"Bearer {token}"})
+            served += 1
+            if response is not None and response.status_code == 401:
+                token = None  # revoked: log in again
+                break
+
+
+async def admin_login(client, deadline) -> Optional[str]:
+    """
+    Admin bearer token, retrying with exponential backoff (503 under bcrypt pressure).
+    None if the deadline passes first.
+    """
+    backoff = 0.05
+    while time.perf_counter() < deadline:
+        try:
+            response = await client.post("/auth/login", json={"email": ADMIN[0], "password": ADMIN[1]})
+        except httpx.HTTPError:
+            response = None
+        if response is not None and response.status_code == 200:
+            return response.json()["access_token"]
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 2.0)
+    return None
+
+
+async def revoker(client, recorder, token, users, interval, deadline):
+    while time.perf_counter() + interval < deadline:
+        await asyncio.sleep(interval)
+        await recorder.request(client, REVOKE_ROUTE, "POST", f"/admin/revoke-user-tokens/{load_email(random.randrange(users))}",
+                               headers={"Authorization": f"Bearer {token}"})
+
+
+async def run(args, base_url):
+    limits = httpx.Limits(max_connections=args.concurrency + 1, max_keepalive_connections=args.concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        # The admin logs in before the load starts: it does not compete with the virtual users' bcrypt
+        admin_token = None
+        if args.revoke_interval > 0:
+            admin_token = await admin_login(client, time.perf_counter() + args.warmup + args.duration)
+            if admin_token is None:
+                print("⚠️  El admin no pudo iniciar sesión: la prueba corre sin revocaciones")
+        started = time.perf_counter()
+        measure_from = started + args.warmup
+        deadline = measure_from + args.duration
+        recorder = Recorder(measure_from)
+        tasks = [
+            virtual_user(client, recorder, load_email(i % args.users), args.protected, args.relogin_every, deadline)
+            for i in range(args.concurrency)
+        ]
+        if admin_token is not None:
+            tasks.append(revoker(client, recorder, admin_token, args.users, args.revoke_interval, deadline))
+        await asyncio.gather(*tasks)
+        return recorder.report(time.perf_counter() - measure_from)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del flujo de autenticación")
+    parser.add_argument("--concurrency", type=int, default=16, help="Usuarios virtuales en paralelo")
+    parser.add_argument("--duration", type=float, default=20, help="Segundos medidos")
+    parser.add_argument("--warmup", type=float, default=3, help="Segundos iniciales sin medir")
+    parser.add_argument("--users", type=int, default=0, help="Cuentas de carga (0 = una por usuario virtual)")
+    parser.add_argument("--protected", nargs="+", default=["/pyrolysis/simulation-data", "/assistants/"],
+                        help="Rutas protegidas (GET) que recorre cada usuario virtual")
+    parser.add_argument("--relogin-every", type=int, default=50, help="Peticiones protegidas por login")
+    parser.add_argument("--revoke-interval", type=float, default=1.0, help="Segundos entre revocaciones (0 = ninguna)")
+    parser.add_argument("--workers", type=int, default=1, help="Workers de uvicorn")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", default="load_auth.json", help="Fichero JSON de resultados")
+    args = parser.parse_args()
+    args.users = args.users or args.concurrency
+
+    print(f"🔧 Seeding {DB_PATH} ({args.users} load users)...")
+    seed(args.users)
+    print(f"🔧 Starting uvicorn with {args.workers} worker(s) on port {args.port}...")
+    server = start_server(args.port, args.workers)
+    try:
+        print(f"🚀 {args.concurrency} virtual users, {args.warmup:g}s warm-up + {args.duration:g}s measured...")
+        results = asyncio.run(run(args, f"http://localhost:{args.port}"))
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"\n{'route':<42}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}{'revoked':>9}")
+    for r in results:
+        print(f"{r['route']:<42}{r['req_per_sec']:>9,.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+              f"{r['error_rate']:>8.1%}{r['revoked']:>9}")
+    revokes = sum(r["requests"] for r in results if r["route"] == REVOKE_ROUTE)
+    if args.revoke_interval > 0 and revokes == 0:
+        print("\n⚠️  No se registró ninguna revocación: la ruta de revocación no se ha medido")
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            **{k: v for k, v in vars(args).items() if k != "output"},
+            "revokes_issued": revokes,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResultados escritos en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
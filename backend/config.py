@@ -14,10 +14,61 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "super_secreto_fallback_inseguro_para_dev"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+
+    # Caché de principales (auth): user_id -> token_version, is_active, roles
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: float = 60
+    TOKEN_CACHE_SIZE: int = 10000  # JWT verificados (claims) hasta su `exp`
+
+    # Actividad de usuarios (last_login_at / last_seen_at), escrita en lotes
+    ACTIVITY_FLUSH_INTERVAL_SECONDS: float = 10
+
+    # Auditoría: cola + hilo escritor con commits agrupados
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_MS: int = 200
+    AUDIT_ENQUEUE_TIMEOUT_MS: int = 50  # Espera con la cola llena antes de descartar el evento
+
+    # Auditoría: retención. Los días más antiguos pasan a segmentos .jsonl.gz + manifest.json
+    AUDIT_RETENTION_DAYS: int = 0  # 0 = desactivada
+    AUDIT_ARCHIVE_DIR: str = "../audit_archive"  # Debe ser un directorio persistente
+    AUDIT_RETENTION_BATCH_SIZE: int = 5000  # Filas por lote al leer y al borrar
+    AUDIT_RETENTION_INTERVAL_SECONDS: float = 3600  # 0 = solo con `python audit_archive.py` (cron)
+    AUDIT_EXPORT_CHUNK_ROWS: int = 5000  # Filas por lectura en /admin/audit-logs/export
+
+    # Pool de bcrypt (login / alta de usuarios)
+    PASSWORD_HASH_WORKERS: int = 0  # 0 = la mitad de os.cpu_count()
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Operaciones en cola antes de responder 503
+    PASSWORD_HASH_BULK_CHUNK: int = 8  # Contraseñas por tarea en altas masivas
+
+    # Alta masiva de usuarios (/admin/users/bulk)
+    BULK_USER_MAX_ROWS: int = 5000
+
+    # Bus de invalidación entre workers: "local" (un solo proceso) o "database" (tabla de cambios)
+    INVALIDATION_BUS: str = "database"
+    INVALIDATION_POLL_INTERVAL_MS: int = 20
+    INVALIDATION_RETAIN_ROWS: int = 10000
 
     # AI
     GEMINI_API_KEY: str = ""
 
+    # Configuración global de módulos (vacío = config/nexo_config.json del repositorio)
+    NEXO_CONFIG_PATH: str = ""
+
+    # Pyrolysis Hub - Catálogo de materiales en memoria
+    MATERIAL_CATALOG_CHECK_SECONDS: float = 5  # Cada cuánto se compara count/max(created_at) con la tabla
+
+    # Pyrolysis Hub - Caché de simulaciones
+    SIMULATION_CACHE_SIZE: int = 4096
+    SIMULATION_CACHE_TTL_SECONDS: float = 300
+
+    # Pyrolysis Hub - Barridos paramétricos
+    SWEEP_MAX_WORKERS: int = 0  # 0 = os.cpu_count() / WEB_CONCURRENCY (pool por worker de uvicorn)
+    SWEEP_MAX_POINTS: int = 5_000_000
+    SWEEP_MAX_JOBS: int = 32
+    SWEEP_JOBS_DIR: str = ""  # Estado compartido entre workers (vacío = <tmp>/nexo_sweeps)
+
     class Config:
         env_file = "../.env"
         env_file_encoding = 'utf-8'
@@ -1,4 +1,6 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config import settings
@@ -24,3 +26,88 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def add_missing_indexes(table):
+    """
+    Same for indexes declared after the table was created.
+    """
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+def add_missing_columns(table, *column_names):
+    """
+    create_all() never alters an existing table: adds nullable columns introduced after
+    the table was created (the project has no migration tool). Safe to run from every worker.
+    """
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    for name in column_names:
+        if name in existing:
+            continue
+        column_type = table.c[name].type.compile(dialect=engine.dialect)
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {column_type}"))
+        except DBAPIError:
+            # Another worker added it first
+            if name not in {column["name"] for column in inspect(engine).get_columns(table.name)}:
+                raise
+
+def normalize_sqlite_timestamps(table, *column_names):
+    """
+    SQLite keeps DateTime as text. Rows filled by server_default=func.now() hold
+    'YYYY-MM-DD HH:MM:SS', which sorts before the 'YYYY-MM-DD HH:MM:SS.ffffff' SQLAlchemy binds
+    for the same second, so range and keyset comparisons went wrong at second boundaries.
+    Rewrites those rows in the bound format. Idempotent; nothing to do on Postgres.
+    A full scan of the table: a one-time migration run by init_db.py, not at API startup.
+    """
+    if engine.dialect.name != "sqlite":
+        return 0
+    updated = 0
+    with engine.begin() as conn:
+        for name in column_names:
+            updated += conn.execute(text(
+                f"UPDATE {table.name} SET {name} = {name} || '.000000' WHERE length({name}) = 19"
+            )).rowcount
+    return updated
+
+def rebuild_legacy_table(table, *required_columns):
+    """
+    Recreates `table` when it predates the current model and lacks a required column that
+    cannot be added in place (e.g. refresh_tokens stored `token_hash` under a VARCHAR id).
+    Its rows are dropped: only for tables whose rows can be lost (sessions, caches).
+    """
+    with engine.begin() as conn:
+        if not inspect(conn).has_table(table.name):
+            return False
+        existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+        if all(name in existing for name in required_columns):
+            return False
+        table.drop(conn)
+        table.create(conn)
+    return True
+
+# --- ASYNC STACK ---
+# Same database through an async driver: asyncpg for Postgres, aiosqlite for SQLite.
+# Handlers awaiting it do not hold a threadpool thread while the query runs.
+
+def to_async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    driver = scheme.split("+")[0]
+    if driver == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if driver in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    raise ValueError(f"No hay driver async para DATABASE_URL: {scheme}")
+
+ASYNC_DATABASE_URL = to_async_url(SQLALCHEMY_DATABASE_URL)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL)
+# sync_session_class: the session listeners registered on SessionLocal (principal cache,
+# material catalog) also see writes made through async sessions
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False, sync_session_class=SessionLocal.class_
+)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
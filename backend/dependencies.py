@@ -1,22 +1,24 @@
+from dataclasses import replace
+from typing import Tuple
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from jose import JWTError
 
-from database import get_db
-from models import User
-from security import SECRET_KEY, ALGORITHM
+from activity_tracker import activity_tracker
+from auth_cache import Principal, principal_cache
+from token_cache import token_cache
 
 # Define the source of the token (Header "Authorization: Bearer <token>")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), 
-    db: Session = Depends(get_db)
-):
+def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
     """
     The Guardian.
     Validates signature, expiration, and TOKEN VERSION.
+    Signature and expiration are verified once per token (token cache); the version, every time.
+    The user's version, status and roles come from the principal cache (no query when warm).
+    The returned principal carries the token's `roles` claim, minus roles removed since.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -25,11 +27,12 @@ def get_current_user(
     )
 
     try:
-        # 1. Decode JWS
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # 1. Decode JWS (verified claims are cached until the token expires)
+        payload = token_cache.decode(token)
         
         user_id: str = payload.get("sub")
         token_ver: int = payload.get("ver") # Extract token version
+        claimed_roles = payload.get("roles") or []
 
         if user_id is None or token_ver is None:
             raise credentials_exception
@@ -37,8 +40,8 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    # 2. Query User in DB
-    user = db.query(User).filter(User.id == user_id).first()
+    # 2. Resolve the principal (cache first, database on a miss)
+    user = principal_cache.get(user_id)
 
     if user is None:
         raise credentials_exception
@@ -52,14 +55,29 @@ def get_current_user(
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Usuario inactivo")
 
+    # 5. Last seen (in memory, flushed in batches)
+    activity_tracker.record_seen(user.id)
+
+    # 6. Authorize from the claim (checked by permissions.require_roles)
+    roles = effective_roles(claimed_roles, user)
+    if roles != user.roles:
+        user = replace(user, roles=roles)
+
     return user
 
-def require_role(user: User, required_role: str):
+def effective_roles(claimed, principal: Principal) -> Tuple[str, ...]:
+    """
+    Roles in the token that the user still holds. Roles granted after the token was
+    issued apply from the next login or /auth/refresh.
+    """
+    return tuple(role for role in claimed if role in principal.roles)
+
+def require_role(user: Principal, required_role: str):
     """
     Helper to verify roles inside a route.
+    Prefer the declarative `Depends(permissions.require_roles(...))`.
     """
-    user_roles = [r.name for r in user.roles]
-    if required_role not in user_roles and "Admin" not in user_roles:
+    if required_role not in user.roles and "Admin" not in user.roles:
         raise HTTPException(
             status_code=403, 
             detail=f"Se requiere rol de {required_role} para esta acción"
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
-from database import engine, SessionLocal, Base
-from models import Role, User, Material
+from database import engine, SessionLocal, Base, add_missing_columns, add_missing_indexes, normalize_sqlite_timestamps, rebuild_legacy_table
+from models import Role, User, Material, AuditLog, RefreshToken
 import json
 
 # Password hashing configuration
@@ -13,6 +13,11 @@ def get_password_hash(password):
 def init_db():
     # Create tables
     Base.metadata.create_all(bind=engine)
+    # Databases created before refresh-token rotation have an incompatible refresh_tokens table
+    rebuild_legacy_table(RefreshToken.__table__, "token")
+    add_missing_columns(User.__table__, "last_seen_at")
+    add_missing_indexes(AuditLog.__table__)
+    normalize_sqlite_timestamps(AuditLog.__table__, "timestamp")
     
     db = SessionLocal()
     try:
@@ -0,0 +1,180 @@
+"""
+Invalidation Bus (multi-worker caches).
+Publishes "drop this cache entry" events to every API worker process. Subscribers register
+a callback per channel; publish() runs the local callbacks at once and broadcasts the
+event so the other workers run theirs.
+
+Backends (settings.INVALIDATION_BUS):
+  local     single process: no broadcast, zero overhead.
+  database  change table `cache_invalidations` in the application database, polled by
+            each worker every INVALIDATION_POLL_INTERVAL_MS (SQLite file or Postgres).
+"""
+import logging
+import os
+import socket
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Callable, Dict, List, Optional
+from uuid import uuid4
+
+from sqlalchemy import delete, func, insert, select
+
+from config import settings
+from database import engine
+from models import CacheInvalidation
+
+logger = logging.getLogger(__name__)
+
+# key=None asks the subscriber to clear everything it holds for the channel
+Subscriber = Callable[[Optional[str]], None]
+
+
+class InvalidationBus:
+    """
+    In-process bus: publish() only reaches subscribers of this process.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Subscriber]] = defaultdict(list)
+
+    def subscribe(self, channel: str, callback: Subscriber):
+        self._subscribers[channel].append(callback)
+
+    def publish(self, channel: str, key: Optional[str] = None):
+        self._deliver(channel, key)
+        self._broadcast(channel, key)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def _deliver(self, channel: str, key: Optional[str]):
+        for callback in self._subscribers.get(channel, ()):
+            try:
+                callback(key)
+            except Exception as e:
+                logger.error(f"Invalidation subscriber failed on {channel}:{key}: {e}")
+
+    def _deliver_all(self):
+        for channel in list(self._subscribers):
+            self._deliver(channel, None)
+
+    def _broadcast(self, channel: str, key: Optional[str]):
+        pass
+
+
+class DatabaseInvalidationBus(InvalidationBus):
+    """
+    Change-table bus: publish() inserts a row, a daemon thread per worker polls for new rows.
+
+    Ids are not guaranteed to commit in order on Postgres, so each poll looks back
+    `lookback` ids and skips the ones already delivered. If polling fails, the caches are
+    cleared once it recovers, since events may have been missed meanwhile.
+    """
+
+    def __init__(self, bind=engine, poll_interval: float = 0.02, retain_rows: int = 10000,
+                 lookback: int = 256):
+        super().__init__()
+        self._engine = bind
+        self.poll_interval = poll_interval
+        self.retain_rows = retain_rows
+        self.lookback = lookback
+        self.origin = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._last_id = 0
+        self._seen: "OrderedDict[int, None]" = OrderedDict()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.published = 0
+        self.received = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        # Only events published after startup matter: caches start empty
+        with self._engine.connect() as conn:
+            self._last_id = conn.execute(select(func.max(CacheInvalidation.id))).scalar() or 0
+            recent = conn.execute(
+                select(CacheInvalidation.id).where(CacheInvalidation.id > self._last_id - self.lookback)
+            ).scalars().all()
+        self._seen = OrderedDict.fromkeys(sorted(recent))
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _broadcast(self, channel: str, key: Optional[str]):
+        with self._engine.begin() as conn:
+            conn.execute(insert(CacheInvalidation).values(channel=channel, key=key, origin=self.origin))
+        self.published += 1
+
+    def _run(self):
+        failed = False
+        polls = 0
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.poll()
+                polls += 1
+                if polls % 1000 == 0:
+                    self.prune()
+                if failed:
+                    logger.warning("Invalidation bus recovered: clearing subscribed caches")
+                    self._deliver_all()
+                    failed = False
+            except Exception as e:
+                if not failed:
+                    logger.error(f"Invalidation bus poll failed: {e}")
+                failed = True
+
+    def poll(self) -> int:
+        """
+        Delivers the events of other workers published since the last poll.
+        """
+        with self._engine.connect() as conn:
+            rows = conn.execute(
+                select(CacheInvalidation.id, CacheInvalidation.channel, CacheInvalidation.key, CacheInvalidation.origin)
+                .where(CacheInvalidation.id > self._last_id - self.lookback)
+                .order_by(CacheInvalidation.id)
+            ).all()
+
+        delivered = 0
+        for row_id, channel, key, origin in rows:
+            if row_id in self._seen:
+                continue
+            self._seen[row_id] = None
+            if origin != self.origin:
+                self._deliver(channel, key)
+                delivered += 1
+            self._last_id = max(self._last_id, row_id)
+        while len(self._seen) > self.lookback * 4:
+            self._seen.popitem(last=False)
+        self.received += delivered
+        return delivered
+
+    def prune(self):
+        """
+        Keeps the newest `retain_rows` events; older ones have been seen by every live worker.
+        """
+        with self._engine.begin() as conn:
+            newest = conn.execute(select(func.max(CacheInvalidation.id))).scalar() or 0
+            conn.execute(delete(CacheInvalidation).where(CacheInvalidation.id <= newest - self.retain_rows))
+
+
+def create_bus(backend: str) -> InvalidationBus:
+    if backend == "local":
+        return InvalidationBus()
+    if backend == "database":
+        return DatabaseInvalidationBus(
+            poll_interval=settings.INVALIDATION_POLL_INTERVAL_MS / 1000,
+            retain_rows=settings.INVALIDATION_RETAIN_ROWS,
+        )
+    raise ValueError(f"INVALIDATION_BUS desconocido: {backend} (local | database)")
+
+
+invalidation_bus = create_bus(settings.INVALIDATION_BUS)
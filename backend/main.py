@@ -5,25 +5,60 @@ if sys.version_info < (3, 10):
     if not hasattr(importlib.metadata, 'packages_distributions'):
         importlib.metadata.packages_distributions = importlib_metadata.packages_distributions
 
-from typing import List
-from datetime import timedelta
-from fastapi import FastAPI, Depends, HTTPException, status, BackgroundTasks, Request
+from typing import List, Optional
+from datetime import date, datetime, timedelta
+from fastapi import FastAPI, Depends, HTTPException, status, BackgroundTasks, Request, Response, Query
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 # Auth Imports
-from database import get_db, engine, Base
-from models import User, AuditLog, Role, Material, Assistant
-from schemas import LoginRequest, TokenResponse, ContextPayload, AuditLogResponse, UserRoleUpdate, User as UserSchema, UserCreate, BridgeRequest, Material as MaterialSchema, SimulationRequest, SimulationResult, KairosRequest, KairosResponse, AssistantCreate, AssistantUpdate, Assistant as AssistantSchema
-from security import verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES, get_password_hash
-from dependencies import get_current_user, require_role
+from database import get_async_db, engine, async_engine, Base, SessionLocal, add_missing_columns, add_missing_indexes, rebuild_legacy_table
+from config import settings
+from models import User, AuditLog, AuditHourlyCount, AuditActorDailyCount, Role, Assistant, RefreshToken
+from schemas import LoginRequest, TokenResponse, RefreshRequest, ContextPayload, AuditLogResponse, AuditHourlyCountResponse, AuditActorDailyCountResponse, UserRoleUpdate, User as UserSchema, UserCreate, BulkUserResult, BridgeRequest, Material as MaterialSchema, SimulationRequest, SimulationResult, SimulationBatchRequest, SimulationSweepRequest, SweepJobStatus, MixtureOptimizationRequest, MixtureOptimizationResult, KairosRequest, KairosResponse, KairosMonteCarloRequest, KairosMonteCarloResult, ExperimentAnalysisRequest, ExperimentAnalysisResult, AssistantCreate, AssistantUpdate, Assistant as AssistantSchema
+from security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from password_hasher import password_hasher, HasherBusyError
+from refresh_tokens import issue_refresh_token, rotate_refresh_token, revoke_refresh_token, revoke_user_refresh_tokens, purge_expired_refresh_tokens
+from dependencies import get_current_user
+from permissions import require_roles
+from auth_cache import Principal, invalidate_principal, principal_cache
+from invalidation_bus import invalidation_bus
+from activity_tracker import activity_tracker
 from nexo_brain import get_system_prompt
-from audit import log_action_background
+from audit import audit_writer, log_action_background, log_actions_background
+from audit_query import AuditLogFilters, audit_log_page_query, decode_cursor, encode_cursor, InvalidCursorError
+from audit_archive import audit_archive, merge_pages, naive_utc, row_key
+from audit_export import EXPORT_FORMATS, encode_rows, export_filename, iter_audit_rows
+from user_provisioning import parse_bulk_users, plan_bulk_users, insert_bulk_users, UnsupportedFormatError, BulkUserFormatError, BulkUserValidationError
 from ai_service import generate_nexo_response, generate_kairos_verdict
+from pyrolysis_engine import simulate_batch, iter_simulate_batch, simulate_one, get_reactor, UnknownReactorError
+from material_catalog import material_catalog
+from simulation_sweep import simplex_grid, simplex_size, sweep_engine
+from mixture_optimizer import optimize_mixture, InfeasibleMixtureError
+from simulation_cache import canonical_key, simulation_cache
+from kairos_engine import run_monte_carlo
+from academic_researcher import analyze_groups, ModuleDisabledError
+import numpy as np
+import itertools
+import json
 from prometheus_fastapi_instrumentator import Instrumentator
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
 # Create tables
 Base.metadata.create_all(bind=engine)
+# Databases created before refresh-token rotation have an incompatible refresh_tokens table
+rebuild_legacy_table(RefreshToken.__table__, "token")
+add_missing_columns(User.__table__, "last_seen_at")
+add_missing_indexes(AuditLog.__table__)
+
+# Material writes invalidate every simulation result derived from the old catalog
+material_catalog.add_invalidation_listener(simulation_cache.clear)
 
 app = FastAPI(title="Nexo Sinérgico Auth System")
 
@@ -37,6 +72,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 @app.get("/")
@@ -45,42 +81,59 @@ def root():
 
 # --- AUTH & SECURITY ENDPOINTS ---
 
+def _hashing_unavailable(e: HasherBusyError) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+def _create_user_access_token(user_id: str, email: str, role_names: List[str], token_version: int) -> str:
+    token_payload = {
+        "sub": user_id,           # Subject (User ID)
+        "email": email,           # Context
+        "roles": role_names,      # For Frontend Access Control
+        "ver": token_version      # CRITICAL: Current token version for invalidation
+    }
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    return create_access_token(data=token_payload, expires_delta=access_token_expires)
+
 @app.post("/auth/login", response_model=TokenResponse, tags=["Authentication"])
-def login_for_access_token(
+async def login_for_access_token(
     form_data: LoginRequest, 
     background_tasks: BackgroundTasks,
     request: Request,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Official Login Endpoint.
-    Verifies credentials and issues a JWS signed with the user's token version.
+    Verifies credentials and issues a JWS signed with the user's token version,
+    plus a refresh token to renew it at /auth/refresh without the password.
+    bcrypt runs on the hashing pool and the queries on the async engine: no threadpool thread is held.
     """
     # 1. Find user by email
-    user = db.query(User).filter(User.email == form_data.email).first()
+    result = await db.execute(select(User).options(selectinload(User.roles)).where(User.email == form_data.email))
+    user = result.scalar_one_or_none()
+    # Give the connection back before waiting on bcrypt: a login burst must not drain the pool
+    await db.close()
 
     # 2. Security Validations
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not user:
+        raise HTTPException(status_code=401, detail="Credenciales incorrectas")
+    try:
+        password_ok = await password_hasher.verify(form_data.password, user.password_hash)
+    except HasherBusyError as e:
+        raise _hashing_unavailable(e)
+    if not password_ok:
         raise HTTPException(status_code=401, detail="Credenciales incorrectas")
         
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Usuario inactivo. Contacte al Admin.")
 
-    # 3. Prepare Token Payload (Data Fusion)
-    role_names = [role.name for role in user.roles]
+    activity_tracker.record_login(user.id)
 
-    token_payload = {
-        "sub": user.id,           # Subject (User ID)
-        "email": user.email,      # Context
-        "roles": role_names,      # For Frontend Access Control
-        "ver": user.token_version # CRITICAL: Current token version for invalidation
-    }
+    # 3. Prepare Token Payload (Data Fusion) and generate JWS
+    role_names = [role.name for role in user.roles]
+    access_token = _create_user_access_token(user.id, user.email, role_names, user.token_version)
 
-    # 4. Generate JWS
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data=token_payload, expires_delta=access_token_expires
-    )
+    # 4. Refresh token (stored hashed)
+    refresh_token = await db.run_sync(issue_refresh_token, user.id)
 
     # 5. Audit Log (Background)
     background_tasks.add_task(
@@ -96,20 +149,56 @@ def login_for_access_token(
         "access_token": access_token,
         "token_type": "bearer",
         "roles": role_names,
-        "user_name": user.full_name
+        "user_name": user.full_name,
+        "refresh_token": refresh_token
+    }
+
+@app.post("/auth/refresh", response_model=TokenResponse, tags=["Authentication"])
+async def refresh_access_token(request: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Exchanges a refresh token for a new access token and a new refresh token (rotation).
+    No password verification; the presented refresh token stops working.
+    """
+    # 1. Redeem (single use)
+    redeemed = await db.run_sync(rotate_refresh_token, request.refresh_token)
+    if redeemed is None:
+        raise HTTPException(status_code=401, detail="Refresh token inválido, expirado o ya utilizado")
+    user_id, refresh_token = redeemed
+
+    # 2. Current state of the user (principal cache: version, status, roles)
+    # (a miss loads through the sync engine: keep it off the event loop)
+    principal = await run_in_threadpool(principal_cache.get, user_id)
+    if principal is None or not principal.is_active:
+        await db.run_sync(revoke_refresh_token, refresh_token)
+        raise HTTPException(status_code=401, detail="Usuario inexistente o inactivo")
+    activity_tracker.record_seen(user_id)
+
+    # 3. New JWS with the current token version
+    return {
+        "access_token": _create_user_access_token(principal.id, principal.email, list(principal.roles), principal.token_version),
+        "token_type": "bearer",
+        "roles": list(principal.roles),
+        "user_name": principal.full_name,
+        "refresh_token": refresh_token
     }
 
+@app.post("/auth/logout", tags=["Authentication"])
+async def logout(request: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Revokes a refresh token. The access token stays valid until it expires.
+    """
+    await db.run_sync(revoke_refresh_token, request.refresh_token)
+    return {"msg": "Sesión cerrada"}
+
 # --- PROTECTED ROUTES (DEMO) ---
 
 @app.get("/pyrolysis/simulation-data", tags=["Pyrolysis Hub"])
-def read_simulation_data(current_user: User = Depends(get_current_user)):
+def read_simulation_data(current_user: Principal = Depends(require_roles("Academico"))):
     """
     Analytical Hub Route.
     Only accessible if token is valid and not revoked.
     """
-    # Relaxed for demo user who is Academico
-    require_role(current_user, "Academico")
-    
+    # Relaxed for demo user who is Academico (see require_roles above)
     return {
         "user": current_user.email,
         "data": "Resultados de Pirólisis: Eficiencia 75%",
@@ -119,14 +208,12 @@ def read_simulation_data(current_user: User = Depends(get_current_user)):
 @app.post("/creative/generate-prompt", tags=["Creative Studio"])
 def generate_creative_prompt(
     request: BridgeRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(require_roles("Colaborador"))
 ):
     """
     Prompt Creator Route.
     Receives the full context and user prompt, and generates a creative response via Gemini.
     """
-    require_role(current_user, "Colaborador")
-
     # Call the AI Service
     ai_response = generate_nexo_response(request.context, request.prompt)
 
@@ -137,13 +224,11 @@ def generate_creative_prompt(
     }
 
 @app.post("/creative/receive-context", tags=["Creative Studio"])
-def ingest_context(payload: ContextPayload, current_user: User = Depends(get_current_user)):
+def ingest_context(payload: ContextPayload, current_user: Principal = Depends(require_roles("Colaborador"))):
     """
     Data Bridge Endpoint.
     Receives the ContextTransferObject from Pyrolysis Hub and primes the Creative AI.
     """
-    require_role(current_user, "Colaborador")
-    
     # In a real scenario, we would store this context in Redis/DB linked to the user's session.
     # For this demo, we acknowledge receipt and return the "primed" state.
     
@@ -159,93 +244,214 @@ def ingest_context(payload: ContextPayload, current_user: User = Depends(get_cur
 @app.post("/nexo-bridge/analyze", tags=["Nexo Bridge"])
 def analyze_with_nexo(
     request: BridgeRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(require_roles("Colaborador", "Academico", detail="No tienes permisos para usar Nexo Bridge"))
 ):
     """
     Generates a response from Nexo (Gemini) based on the technical context and the user's request.
-    Requires 'Colaborador' or 'Admin' role.
+    Requires 'Colaborador', 'Academico' or 'Admin' role.
     """
-    # Allow Colaborador, Admin, or Academico
-    if not any(r.name in ["Colaborador", "Admin", "Academico"] for r in current_user.roles):
-        raise HTTPException(status_code=403, detail="No tienes permisos para usar Nexo Bridge")
-
     response_text = generate_nexo_response(request.context, request.prompt)
     return {"response": response_text}
 
 # --- EMERGENCY ROUTE (ADMIN) ---
 
 @app.post("/admin/revoke-user-tokens/{user_email}", tags=["Admin"])
-def revoke_tokens(user_email: str, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def revoke_tokens(user_email: str, current_user: Principal = Depends(require_roles("Admin")), db: AsyncSession = Depends(get_async_db)):
     """
     Panic Button: Invalidates ALL existing tokens for a user instantly.
     """
-    require_role(current_user, "Admin")
-
-    target_user = db.query(User).filter(User.email == user_email).first()
+    result = await db.execute(select(User).where(User.email == user_email))
+    target_user = result.scalar_one_or_none()
     if not target_user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
         
-    # THE MAGIC: Simply increment the version
+    # THE MAGIC: Simply increment the version (and drop every refresh token)
     target_user.token_version += 1
-    db.commit()
+    await db.run_sync(revoke_user_refresh_tokens, target_user.id)
+    await db.commit()
+    # (publishing on the database bus is a sync INSERT: keep it off the event loop)
+    await run_in_threadpool(invalidate_principal, target_user.id)
 
     return {"msg": f"Tokens revocados. El usuario {user_email} deberá loguearse de nuevo."}
 
 # --- ADMIN CONSOLE ENDPOINTS ---
 
 @app.get("/admin/audit-logs", response_model=List[AuditLogResponse], tags=["Admin Console"])
-def get_audit_logs(
-    skip: int = 0, 
-    limit: int = 100, 
-    current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+async def get_audit_logs(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    actor_id: Optional[str] = None,
+    action_type: Optional[str] = None,
+    target_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: Principal = Depends(require_roles("Admin")), 
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Retrieve system audit logs.
+    Retrieve system audit logs, newest first.
+    Keyset pagination: pass the X-Next-Cursor response header as `cursor` to get the next
+    page (no header = last page). Filters: actor_id, action_type, target_id, since <= timestamp < until.
+    Days moved out by the retention job (audit_archive.py) are read from the archive segments.
     """
-    require_role(current_user, "Admin")
-    logs = db.query(AuditLog).order_by(AuditLog.timestamp.desc()).offset(skip).limit(limit).all()
+    filters = AuditLogFilters(actor_id=actor_id, action_type=action_type, target_id=target_id, since=since, until=until)
+    try:
+        query = audit_log_page_query(filters, cursor, limit)
+        before = None
+        if cursor:
+            timestamp, log_id = decode_cursor(cursor)
+            before = (naive_utc(timestamp), log_id)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    logs = (await db.execute(query)).scalars().all()
+    # Archived rows only matter if they are newer than the last hot row of a full page
+    after = row_key(logs[-1]) if len(logs) > limit else None
+    if audit_archive.has_candidates(filters, before, after):
+        archived = await run_in_threadpool(audit_archive.page, filters, before, limit, after)
+        logs = merge_pages(logs, archived, limit)
+    if len(logs) > limit:
+        logs = logs[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(logs[-1].timestamp, logs[-1].id)
     return logs
 
+@app.get("/admin/audit-logs/export", tags=["Admin Console"])
+def export_audit_logs(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    export_format: str = Query("ndjson", alias="format", pattern="^(csv|ndjson)$"),
+    compress: bool = Query(False, alias="gzip"),
+    actor_id: Optional[str] = None,
+    action_type: Optional[str] = None,
+    target_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    current_user: Principal = Depends(require_roles("Admin"))
+):
+    """
+    Streams every audit log matching the filters, oldest first, as CSV or NDJSON (gzip=true
+    for a .gz download). Archived days included. Without `until` the export stops at the
+    moment of the request, so it always ends.
+    """
+    started = datetime.utcnow()
+    filters = AuditLogFilters(
+        actor_id=actor_id, action_type=action_type, target_id=target_id,
+        since=naive_utc(since) if since else None,
+        until=min(naive_utc(until), started) if until else started,
+    )
+    rows = iter_audit_rows(filters, settings.AUDIT_EXPORT_CHUNK_ROWS)
+
+    background_tasks.add_task(
+        log_action_background,
+        actor_id=current_user.id,
+        action_type="AUDIT_EXPORT",
+        ip_address=request.client.host,
+        details={"format": export_format, "gzip": compress, "actor_id": actor_id, "action_type": action_type,
+                 "target_id": target_id, "since": filters.since and filters.since.isoformat(),
+                 "until": filters.until.isoformat()}
+    )
+    filename = export_filename(export_format, compress, started)
+    return StreamingResponse(
+        encode_rows(rows, export_format, compress),
+        media_type="application/gzip" if compress else EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@app.get("/admin/audit-logs/rollups/hourly", response_model=List[AuditHourlyCountResponse], tags=["Admin Console"])
+async def get_audit_hourly_counts(
+    action_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(10000, ge=1, le=100000),
+    current_user: Principal = Depends(require_roles("Admin")),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Events per action type and UTC hour, oldest first (since <= bucket < until).
+    Served from the rollup kept by the audit writer: cost grows with buckets, not events.
+    """
+    query = select(AuditHourlyCount)
+    if action_type is not None:
+        query = query.where(AuditHourlyCount.action_type == action_type)
+    if since is not None:
+        query = query.where(AuditHourlyCount.bucket >= naive_utc(since))
+    if until is not None:
+        query = query.where(AuditHourlyCount.bucket < naive_utc(until))
+    query = query.order_by(AuditHourlyCount.bucket, AuditHourlyCount.action_type).limit(limit)
+    return (await db.execute(query)).scalars().all()
+
+@app.get("/admin/audit-logs/rollups/actors", response_model=List[AuditActorDailyCountResponse], tags=["Admin Console"])
+async def get_audit_actor_daily_counts(
+    actor_id: Optional[str] = None,
+    action_type: Optional[str] = None,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    limit: int = Query(10000, ge=1, le=100000),
+    current_user: Principal = Depends(require_roles("Admin")),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Events per actor, UTC day and action type, oldest first (since <= day < until).
+    actor_id null = system actions. Served from the rollup kept by the audit writer.
+    """
+    query = select(AuditActorDailyCount)
+    if actor_id is not None:
+        query = query.where(AuditActorDailyCount.actor_id == actor_id)
+    if action_type is not None:
+        query = query.where(AuditActorDailyCount.action_type == action_type)
+    if since is not None:
+        query = query.where(AuditActorDailyCount.day >= since)
+    if until is not None:
+        query = query.where(AuditActorDailyCount.day < until)
+    query = query.order_by(AuditActorDailyCount.day, AuditActorDailyCount.actor_id, AuditActorDailyCount.action_type).limit(limit)
+    rows = (await db.execute(query)).scalars().all()
+    return [
+        AuditActorDailyCountResponse(actor_id=row.actor_id or None, day=row.day, action_type=row.action_type, count=row.count)
+        for row in rows
+    ]
+
 @app.get("/admin/users", response_model=List[UserSchema], tags=["Admin Console"])
-def list_users(
-    current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+async def list_users(
+    current_user: Principal = Depends(require_roles("Admin")), 
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List all users in the system.
     """
-    require_role(current_user, "Admin")
-    users = db.query(User).all()
-    return users
+    result = await db.execute(select(User).options(selectinload(User.roles)))
+    return result.scalars().all()
 
 @app.post("/admin/users", response_model=UserSchema, tags=["Admin Console"])
-def create_user(
+async def create_user(
     user: UserCreate,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_roles("Admin")),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new user.
     """
-    require_role(current_user, "Admin")
-    
-    # Check if user exists
-    if db.query(User).filter(User.email == user.email).first():
+    # Check if user exists (and release the connection while bcrypt runs)
+    result = await db.execute(select(User.id).where(User.email == user.email))
+    email_taken = result.first() is not None
+    await db.close()
+    if email_taken:
         raise HTTPException(status_code=400, detail="El email ya está registrado")
     
-    hashed_password = get_password_hash(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except HasherBusyError as e:
+        raise _hashing_unavailable(e)
     db_user = User(
         email=user.email,
         full_name=user.full_name,
         password_hash=hashed_password,
-        is_active=user.is_active
+        is_active=user.is_active,
+        roles=[]  # loaded (empty): response serialization must not lazy-load
     )
-    
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     
     # Audit Log
     background_tasks.add_task(
@@ -258,19 +464,75 @@ def create_user(
     
     return db_user
 
+@app.post("/admin/users/bulk", response_model=BulkUserResult, tags=["Admin Console"])
+async def bulk_create_users(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(require_roles("Admin")),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Bulk user provisioning (partner lab onboarding).
+    Body: JSON (a list of users or {"users": [...]}) or CSV (Content-Type: text/csv) with the
+    header email,full_name,password[,roles][,is_active]; several roles separated by ';'.
+    Emails already registered or repeated in the request are skipped and reported; the
+    rest are created in one transaction. bcrypt dominates: ~N x hash time / hashing workers.
+    """
+    # 1. Parse and validate every row
+    try:
+        users = parse_bulk_users(await request.body(), request.headers.get("content-type", ""), settings.BULK_USER_MAX_ROWS)
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except BulkUserFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except BulkUserValidationError as e:
+        raise HTTPException(status_code=422, detail={"message": str(e), "errors": e.errors})
+
+    # 2. One IN query for taken emails and one for the roles (then release the connection while bcrypt runs)
+    try:
+        to_create, skipped, role_ids = await db.run_sync(plan_bulk_users, users)
+    except BulkUserValidationError as e:
+        raise HTTPException(status_code=422, detail={"message": str(e), "errors": e.errors})
+    finally:
+        await db.close()
+
+    # 3. Hash in parallel on the hashing pool
+    try:
+        password_hashes = await password_hasher.hash_many([user.password for _, user in to_create])
+    except HasherBusyError as e:
+        raise _hashing_unavailable(e)
+
+    # 4. Users + role assignments, single transaction
+    try:
+        created = await db.run_sync(insert_bulk_users, to_create, password_hashes, role_ids) if to_create else []
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Alguno de los emails se registró durante la carga. Reintente la solicitud.")
+
+    # 5. Audit Log (one batched insert)
+    background_tasks.add_task(log_actions_background, [
+        {
+            "actor_id": current_user.id,
+            "action_type": "USER_CREATE",
+            "target_id": new_user["id"],
+            "details": {"email": user.email, "full_name": user.full_name, "roles": user.roles, "bulk": True},
+        }
+        for new_user, (_, user) in zip(created, to_create)
+    ])
+
+    return {"created": created, "skipped": skipped}
+
 @app.delete("/admin/users/{user_id}", tags=["Admin Console"])
-def delete_user(
+async def delete_user(
     user_id: str,
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_roles("Admin")),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a user.
     """
-    require_role(current_user, "Admin")
-    
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
         
@@ -278,8 +540,9 @@ def delete_user(
         raise HTTPException(status_code=400, detail="No puedes eliminar tu propia cuenta")
         
     email = user.email # Save for log
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    await run_in_threadpool(invalidate_principal, user_id)
     
     # Audit Log
     background_tasks.add_task(
@@ -293,23 +556,22 @@ def delete_user(
     return {"message": "Usuario eliminado correctamente"}
 
 @app.post("/admin/users/{user_id}/roles", tags=["Admin Console"])
-def manage_user_roles(
+async def manage_user_roles(
     user_id: str, 
     request: UserRoleUpdate, 
     background_tasks: BackgroundTasks,
-    current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(require_roles("Admin")), 
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Assign or remove roles from a user.
     """
-    require_role(current_user, "Admin")
-    
-    target_user = db.query(User).filter(User.id == user_id).first()
+    target_user = await db.get(User, user_id, options=[selectinload(User.roles)])
     if not target_user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
         
-    role = db.query(Role).filter(Role.name == request.role_name).first()
+    result = await db.execute(select(Role).where(Role.name == request.role_name))
+    role = result.scalar_one_or_none()
     if not role:
         raise HTTPException(status_code=404, detail=f"Rol '{request.role_name}' no existe")
         
@@ -326,7 +588,8 @@ def manage_user_roles(
         else:
             message = f"El usuario no tiene el rol {request.role_name}"
             
-    db.commit()
+    await db.commit()
+    await run_in_threadpool(invalidate_principal, target_user.id)
     
     # Audit Log
     background_tasks.add_task(
@@ -342,191 +605,381 @@ def manage_user_roles(
 # --- PYROLYSIS HUB ENDPOINTS ---
 
 @app.get("/api/materials", response_model=List[MaterialSchema], tags=["Pyrolysis Hub"])
-def get_materials(db: Session = Depends(get_db)):
+def get_materials():
     """
     Devuelve la 'Tabla Periódica' de materiales disponibles para la simulación.
+    Servida desde el snapshot del catálogo en memoria.
     """
-    return db.query(Material).all()
+    return material_catalog.snapshot().materials
 
 @app.post("/api/simulate", response_model=SimulationResult, tags=["Pyrolysis Hub"])
-def run_simulation(request: SimulationRequest, db: Session = Depends(get_db)):
+def run_simulation(request: SimulationRequest):
     """
     Motor de Simulación Avanzado (Backend).
-    Calcula rendimientos basados en cinética química y valida reglas físicas.
+    Calcula rendimientos basados en cinética química y valida reglas físicas
+    con el modelo del reactor indicado en `reactorType` (pyrolysis_engine).
+    Las solicitudes idénticas (tras normalizar la mezcla) se sirven desde la caché.
     """
-    warnings = []
-    
-    # 1. Validación de Reglas Físicas
-    if request.pyrolysisMode == "FAST" and request.residenceTime > 2.0:
-        warnings.append(f"Alerta de Proceso: La pirolisis rápida requiere tiempos < 2s (Actual: {request.residenceTime}s). Se ha ajustado el modelo a Pirolisis Lenta para mayor precisión.")
-        request.pyrolysisMode = "SLOW"
-
-    # 2. Obtener propiedades de la mezcla desde la DB
-    total_c = 0
-    total_h = 0
-    total_o = 0
-    total_n = 0
-    total_s = 0
-    total_cl = 0
-    total_ash = 0
-    total_moisture = 0
-    
-    mixture_mass = 0 # Base de cálculo 100 unidades (por los porcentajes)
+    _check_reactors([request])
+    catalog = material_catalog.snapshot()
+    cache_key = canonical_key(request, catalog.properties, catalog.index)
+    cached = simulation_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    result = simulate_one(request, catalog.properties, catalog.index)
+    simulation_cache.put(cache_key, result)
+    return result
+
+@app.get("/api/simulate/cache", tags=["Pyrolysis Hub"])
+def get_simulation_cache_stats(current_user: Principal = Depends(require_roles("Admin"))):
+    """
+    Estadísticas de la caché de simulaciones (hits, misses, evictions...).
+    """
+    return simulation_cache.stats()
 
-    for item in request.mixture:
-        # item is {id: str, percent: float}
-        material = db.query(Material).filter(Material.id == item['id']).first()
-        if not material:
-            continue
-            
-        percent = item['percent']
-        props = material.properties
-        
-        # Normalizar propiedades
-        c = props.get('c_h_o_n', {}).get('c', 0)
-        h = props.get('c_h_o_n', {}).get('h', 0)
-        o = props.get('c_h_o_n', {}).get('o', 0)
-        n = props.get('c_h_o_n', {}).get('n', 0)
-        s = props.get('s', 0)
-        cl = props.get('cl', 0)
-        ash = props.get('ash', 0)
-        moisture = props.get('moisture_default', 0)
-
-        total_c += c * percent
-        total_h += h * percent
-        total_o += o * percent
-        total_n += n * percent
-        total_s += s * percent
-        total_cl += cl * percent
-        total_ash += ash * percent
-        total_moisture += moisture * percent
-        mixture_mass += percent
-
-    if mixture_mass == 0:
-        return SimulationResult(yields={"oil": 0, "char": 0, "gas": 0}, efficiency=0, warnings=["Mezcla vacía"], analysis="Sin datos")
-
-    # Promedios ponderados
-    avg_c = total_c / mixture_mass
-    avg_h = total_h / mixture_mass
-    avg_o = total_o / mixture_mass
-    avg_n = total_n / mixture_mass
-    avg_s = total_s / mixture_mass
-    avg_cl = total_cl / mixture_mass
-    avg_ash = total_ash / mixture_mass
-    avg_moisture = total_moisture / mixture_mass
-
-    # Alertas de Contaminantes
-    if avg_cl > 0.1:
-        warnings.append(f"ALERTA CRÍTICA: Contenido de Cloro ({avg_cl:.2f}%) excede el límite seguro. Riesgo de corrosión y formación de dioxinas.")
-    if avg_s > 0.5:
-        warnings.append(f"Advertencia Ambiental: Contenido de Azufre ({avg_s:.2f}%) alto. Requiere tratamiento de gases (SOx).")
-    if avg_n > 1.0:
-        warnings.append(f"Nota: Contenido de Nitrógeno ({avg_n:.2f}%) puede generar NOx.")
-
-    # 3. Modelo Cinético Simplificado (Basado en ratios H/C y O/C)
-    # H/C alto favorece volátiles (Oil/Gas). O/C alto baja valor calorífico.
-    
-    # Base yields
-    oil_yield = 0
-    char_yield = 0
-    gas_yield = 0
-    
-    if request.pyrolysisMode == "FAST":
-        # Maximiza Oil
-        oil_yield = 50 + (avg_h * 2) - (avg_o * 0.5) - (avg_ash * 1.5)
-        char_yield = 15 + (avg_c * 0.3) + avg_ash
-        gas_yield = 100 - oil_yield - char_yield
-    elif request.pyrolysisMode == "SLOW":
-        # Maximiza Char
-        char_yield = 35 + (avg_c * 0.5) + avg_ash
-        oil_yield = 20 + (avg_h * 1.5)
-        gas_yield = 100 - oil_yield - char_yield
-    else: # FLASH or others
-        oil_yield = 60 + (avg_h * 2)
-        char_yield = 10 + avg_ash
-        gas_yield = 100 - oil_yield - char_yield
-
-    # Ajuste por Temperatura/Atmósfera (Simplificado)
-    if request.atmosphere == "STEAM":
-        gas_yield += 10
-        oil_yield -= 5
-        char_yield -= 5
-
-    # Normalización final a 100%
-    total_yield = oil_yield + char_yield + gas_yield
-    oil_yield = (oil_yield / total_yield) * 100
-    char_yield = (char_yield / total_yield) * 100
-    gas_yield = (gas_yield / total_yield) * 100
-
-    # Eficiencia
-    efficiency = 85 - (avg_moisture * 1.2)
-    if request.residenceTime > 10 and request.pyrolysisMode == "FAST":
-        efficiency -= 10 # Penalización por reacciones secundarias
-
-    analysis = f"Mezcla rica en Carbono ({avg_c:.1f}%) e Hidrógeno ({avg_h:.1f}%). "
-    if oil_yield > 50:
-        analysis += "Alto potencial para Bio-combustibles líquidos."
-    elif char_yield > 30:
-        analysis += "Excelente para producción de Biochar y secuestro de carbono."
-    else:
-        analysis += "Producción equilibrada de Syngas."
-
-    return SimulationResult(
-        yields={
-            "oil": round(oil_yield, 1),
-            "char": round(char_yield, 1),
-            "gas": round(gas_yield, 1)
-        },
-        efficiency=round(efficiency, 1),
-        warnings=warnings,
-        analysis=analysis
+def _check_reactors(requests: List[SimulationRequest]):
+    """
+    Rejects unknown reactorType values up front (400) instead of mid-computation.
+    """
+    try:
+        for reactor_type in {r.reactorType for r in requests}:
+            get_reactor(reactor_type)
+    except UnknownReactorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/api/simulate/batch", response_model=List[SimulationResult], tags=["Pyrolysis Hub"])
+def run_simulation_batch(request: SimulationBatchRequest):
+    """
+    Simulación por lotes (Backend).
+    Evalúa N combinaciones de mezcla/modo/atmósfera/tiempo de residencia en una sola pasada
+    vectorizada y devuelve los resultados en el orden de la solicitud.
+    """
+    _check_reactors(request.scenarios)
+    catalog = material_catalog.snapshot()
+    return simulate_batch(request.scenarios, catalog.properties, catalog.index)
+
+@app.post("/api/simulate/batch/stream", tags=["Pyrolysis Hub"])
+def stream_simulation_batch(request: SimulationBatchRequest):
+    """
+    Simulación por lotes en streaming (NDJSON).
+    Cada SimulationResult se escribe como una línea en cuanto se calcula, en el orden de la solicitud.
+    """
+    _check_reactors(request.scenarios)
+    catalog = material_catalog.snapshot()
+
+    def generate():
+        for result in iter_simulate_batch(request.scenarios, catalog.properties, catalog.index):
+            yield result.model_dump_json() + "\n"
+
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
+
+@app.post("/api/simulate/optimize", response_model=MixtureOptimizationResult, tags=["Pyrolysis Hub"])
+def optimize_simulation_mixture(request: MixtureOptimizationRequest):
+    """
+    Optimizador de Mezclas (Backend).
+    Resuelve como programa lineal la mezcla que maximiza el objetivo (oil, char, gas o efficiency)
+    con límites sobre los promedios ponderados (p. ej. Cl < 0.1%, S < 0.5%).
+    """
+    catalog = material_catalog.snapshot()
+    material_ids = request.materials or list(catalog.index)
+    missing = [m for m in material_ids if m not in catalog.index]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Materiales no encontrados: {', '.join(missing)}")
+    if not material_ids:
+        raise HTTPException(status_code=400, detail="No hay materiales candidatos")
+    unbounded = sorted((set(request.minPercent) | set(request.maxPercent)) - set(material_ids))
+    if unbounded:
+        raise HTTPException(status_code=422, detail=f"Límites por material para materiales fuera de los candidatos: {', '.join(unbounded)}")
+
+    try:
+        solution = optimize_mixture(
+            catalog.properties[[catalog.index[m] for m in material_ids]],
+            material_ids,
+            objective=request.objective,
+            pyrolysis_mode=request.pyrolysisMode,
+            atmosphere=request.atmosphere,
+            residence_time=request.residenceTime,
+            max_averages=request.maxAverages,
+            min_percent=request.minPercent,
+            max_percent=request.maxPercent,
+            reactor_type=request.reactorType,
+        )
+    except InfeasibleMixtureError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    mixture = [
+        {"id": material_id, "percent": percent}
+        for material_id, percent in zip(material_ids, solution["percents"].tolist())
+        if percent > 1e-6
+    ]
+    simulation_request = SimulationRequest(
+        mixture=mixture,
+        reactorType=request.reactorType,
+        pyrolysisMode=request.pyrolysisMode,
+        atmosphere=request.atmosphere,
+        residenceTime=request.residenceTime,
     )
 
+    # Yields are >= 0 up to the solver tolerance: no -0.0 (or -1e-9) in the response
+    simulation = simulate_batch([simulation_request], catalog.properties, catalog.index)[0]
+    simulation.yields = {name: max(0.0, value) for name, value in simulation.yields.items()}
+
+    return MixtureOptimizationResult(
+        mixture=mixture,
+        objective=request.objective,
+        objective_value=round(solution["objective_value"], 4) + 0.0,  # + 0.0: -0.0 -> 0.0
+        binding_constraints=solution["binding_constraints"],
+        simulation=simulation,
+    )
+
+def _sweep_status(job, include_result: bool) -> SweepJobStatus:
+    status_data = {
+        "job_id": job.id,
+        "status": job.status,
+        "total_points": job.total_points,
+        "completed_points": job.completed_points,
+        "chunks": job.chunks,
+        "error": job.error,
+    }
+    if include_result and job.status == "DONE":
+        status_data["result"] = {
+            "shape": list(job.shape),
+            "fractions": job.fractions.tolist(),
+            **{name: array.tolist() for name, array in job.arrays.items()},
+        }
+    return SweepJobStatus(**status_data)
+
+@app.post("/api/simulate/sweep", response_model=SweepJobStatus, tags=["Pyrolysis Hub"])
+def start_simulation_sweep(request: SimulationSweepRequest, current_user: Principal = Depends(require_roles("Academico"))):
+    """
+    Barrido Paramétrico (Academico).
+    Reparte la rejilla residenceTime × pyrolysisMode × atmosphere × fracción de mezcla sobre
+    un pool de procesos. Consultar el progreso y el resultado con GET /api/simulate/sweep/{job_id}.
+    """
+    properties, fractions = _sweep_inputs(request)
+    try:
+        job = sweep_engine.submit(
+            properties,
+            fractions,
+            request.pyrolysisModes,
+            request.atmospheres,
+            request.residenceTimes,
+            request.reactorType,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return _sweep_status(job, include_result=False)
+
+@app.post("/api/simulate/sweep/stream", tags=["Pyrolysis Hub"])
+def stream_simulation_sweep(request: SimulationSweepRequest, current_user: Principal = Depends(require_roles("Academico"))):
+    """
+    Barrido Paramétrico en streaming (NDJSON).
+    Cada punto de la rejilla se escribe como una línea en cuanto termina su bloque.
+    Las líneas llegan en orden de cálculo; `index` es la posición plana en la rejilla.
+    """
+    properties, fractions = _sweep_inputs(request)
+    try:
+        chunks = sweep_engine.stream(
+            properties,
+            fractions,
+            request.pyrolysisModes,
+            request.atmospheres,
+            request.residenceTimes,
+            request.reactorType,
+        )
+        # Prime the generator so grid validation errors surface as a 400, not mid-stream
+        first = next(chunks, None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    shape = (len(request.residenceTimes), len(request.pyrolysisModes), len(request.atmospheres), len(fractions))
+    fraction_rows = fractions.tolist()
+
+    def generate():
+        pending = [first] if first else []
+        for start, stop, arrays in itertools.chain(pending, chunks):
+            r, p, a, f = np.unravel_index(np.arange(start, stop), shape)
+            values = {name: array.tolist() for name, array in arrays.items()}
+            for offset, (ri, pi, ai, fi) in enumerate(zip(r.tolist(), p.tolist(), a.tolist(), f.tolist())):
+                yield json.dumps({
+                    "index": start + offset,
+                    "residenceTime": request.residenceTimes[ri],
+                    "pyrolysisMode": request.pyrolysisModes[pi],
+                    "atmosphere": request.atmospheres[ai],
+                    "fraction": fraction_rows[fi],
+                    **{name: column[offset] for name, column in values.items()},
+                }) + "\n"
+
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE)
+
+def _sweep_inputs(request: SimulationSweepRequest):
+    """
+    Resolves the swept materials against the catalog and builds the mixture-fraction axis.
+    """
+    catalog = material_catalog.snapshot()
+    missing = [m for m in request.materials if m not in catalog.index]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Materiales no encontrados: {', '.join(missing)}")
+
+    try:
+        if request.fractions:
+            fractions = np.array(request.fractions, dtype=np.float64)
+            if fractions.ndim != 2 or fractions.shape[1] != len(request.materials):
+                raise ValueError("Cada vector de 'fractions' debe tener un valor por material")
+        elif request.fractionStep:
+            # Reject oversized grids before building the mixture axis, not after
+            other_axes = len(request.residenceTimes) * len(request.pyrolysisModes) * len(request.atmospheres)
+            sweep_engine.check_size(simplex_size(len(request.materials), request.fractionStep) * other_axes)
+            fractions = simplex_grid(len(request.materials), request.fractionStep)
+        else:
+            raise ValueError("Defina 'fractions' o 'fractionStep'")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows = [catalog.index[m] for m in request.materials]
+    return catalog.properties[rows], fractions
+
+@app.get("/api/simulate/sweep/{job_id}", response_model=SweepJobStatus, tags=["Pyrolysis Hub"])
+def get_simulation_sweep(job_id: str, include_result: bool = True, current_user: Principal = Depends(require_roles("Academico"))):
+    """
+    Progreso por bloque y, al terminar, el resultado compacto del barrido.
+    """
+    job = sweep_engine.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Barrido no encontrado")
+    return _sweep_status(job, include_result)
+
+@app.on_event("startup")
+def start_invalidation_bus():
+    invalidation_bus.start()
+
+@app.on_event("startup")
+def purge_refresh_tokens():
+    db = SessionLocal()
+    try:
+        purge_expired_refresh_tokens(db)
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def start_activity_tracker():
+    activity_tracker.start()
+
+@app.on_event("shutdown")
+def stop_activity_tracker():
+    activity_tracker.stop()
+
+@app.on_event("startup")
+def start_audit_retention():
+    audit_archive.start()
+
+@app.on_event("shutdown")
+def stop_audit_retention():
+    audit_archive.stop()
+
+@app.on_event("shutdown")
+def flush_audit_log():
+    audit_writer.stop()
+
+@app.on_event("shutdown")
+def stop_invalidation_bus():
+    invalidation_bus.stop()
+
+@app.on_event("shutdown")
+def shutdown_password_hasher():
+    password_hasher.shutdown()
+
+@app.on_event("shutdown")
+def shutdown_sweep_engine():
+    sweep_engine.shutdown()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+
+@app.post("/api/kairos/monte-carlo", response_model=KairosMonteCarloResult, tags=["Nexo AI"])
+def run_kairos_monte_carlo(request: KairosMonteCarloRequest, current_user: Principal = Depends(get_current_user)):
+    """
+    Kairos M5: distribución de la TIR (Monte Carlo vectorizado) para un rendimiento de bio-aceite.
+    """
+    return run_monte_carlo(**request.model_dump())
+
 @app.post("/api/nexo/kairos_verdict", response_model=KairosResponse, tags=["Nexo AI"])
-async def get_kairos_verdict(request: KairosRequest, current_user: User = Depends(get_current_user)):
+async def get_kairos_verdict(
+    request: KairosRequest,
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_current_user)
+):
     """
     Generates a financial verdict from Kairos (Auditor Persona).
+    The IRR figures come from the backend Monte Carlo, never from the client.
     Requires authentication.
     """
+    assumptions = request.assumptions
+    # (up to 1M iterations of numpy work: keep it off the event loop)
+    simulation = await run_in_threadpool(run_monte_carlo, yield_bio_oil=request.yield_bio_oil, **assumptions.model_dump())
+
     verdict = generate_kairos_verdict(
         user_query=request.user_query,
         yield_bio_oil=request.yield_bio_oil,
-        avg_irr=request.avg_irr,
-        profitability=request.profitability
+        avg_irr=simulation["mean_irr"],
+        profitability=simulation["probability_irr_above_cost_of_capital"],
+        iterations=simulation["iterations"],
+        price_uncertainty=assumptions.price_uncertainty,
+        opex_per_year=assumptions.opex_per_year,
+        cost_of_capital=simulation["cost_of_capital"]
     )
     
-    # Log the audit action
-    log_action_background(
-        db=None, # We'd need to pass db session here if we want to log to DB, but log_action_background handles it differently or we need to refactor.
-                 # For now, let's assume we just return the verdict. 
-                 # Ideally we should inject BackgroundTasks and DB session.
-        user_id=current_user.id,
-        action="KAIROS_AUDIT",
-        details=f"Audit requested for yield {request.yield_bio_oil}%"
+    # Audit Log
+    background_tasks.add_task(
+        log_action_background,
+        actor_id=current_user.id,
+        action_type="KAIROS_AUDIT",
+        details={"yield_bio_oil": request.yield_bio_oil, "mean_irr": simulation["mean_irr"]}
     )
     
-    return KairosResponse(verdict=verdict)
+    return KairosResponse(verdict=verdict, simulation=simulation)
+
+# --- ACADEMIC RESEARCHER ENDPOINTS ---
+
+@app.post("/api/research/analyze", response_model=ExperimentAnalysisResult, tags=["Academic Researcher"])
+def analyze_experiment(request: ExperimentAnalysisRequest, current_user: Principal = Depends(require_roles("Academico"))):
+    """
+    Análisis estadístico de grupos experimentales (medias, varianzas, IC y pruebas t),
+    vectorizado sobre todas las columnas KPI y parametrizado por nexo_config.json.
+    """
+    try:
+        return analyze_groups(request.groups, control_group=request.control_group, kpis=request.kpis)
+    except ModuleDisabledError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # --- ASSISTANT ENDPOINTS ---
 
 @app.post("/assistants/", response_model=AssistantSchema, tags=["Assistants"])
-def create_assistant(assistant: AssistantCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_assistant(assistant: AssistantCreate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
     db_assistant = Assistant(**assistant.dict())
     db.add(db_assistant)
-    db.commit()
-    db.refresh(db_assistant)
+    await db.commit()
+    await db.refresh(db_assistant)
     return db_assistant
 
 @app.get("/assistants/", response_model=List[AssistantSchema], tags=["Assistants"])
-def read_assistants(owner_titan_id: str = None, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    query = db.query(Assistant)
+async def read_assistants(owner_titan_id: str = None, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    query = select(Assistant)
     if owner_titan_id:
-        query = query.filter(Assistant.owner_titan_id == owner_titan_id)
-    return query.all()
+        query = query.where(Assistant.owner_titan_id == owner_titan_id)
+    result = await db.execute(query)
+    return result.scalars().all()
 
 @app.patch("/assistants/{assistant_id}", response_model=AssistantSchema, tags=["Assistants"])
-def update_assistant(assistant_id: str, assistant_update: AssistantUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    db_assistant = db.query(Assistant).filter(Assistant.id == assistant_id).first()
+async def update_assistant(assistant_id: str, assistant_update: AssistantUpdate, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    db_assistant = await db.get(Assistant, assistant_id)
     if not db_assistant:
         raise HTTPException(status_code=404, detail="Assistant not found")
     
@@ -534,18 +987,18 @@ def update_assistant(assistant_id: str, assistant_update: AssistantUpdate, db: S
     for key, value in update_data.items():
         setattr(db_assistant, key, value)
     
-    db.commit()
-    db.refresh(db_assistant)
+    await db.commit()
+    await db.refresh(db_assistant)
     return db_assistant
 
 @app.delete("/assistants/{assistant_id}", tags=["Assistants"])
-def delete_assistant(assistant_id: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    db_assistant = db.query(Assistant).filter(Assistant.id == assistant_id).first()
+async def delete_assistant(assistant_id: str, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    db_assistant = await db.get(Assistant, assistant_id)
     if not db_assistant:
         raise HTTPException(status_code=404, detail="Assistant not found")
     
-    db.delete(db_assistant)
-    db.commit()
+    await db.delete(db_assistant)
+    await db.commit()
     return {"message": "Assistant deleted successfully"}
 
 if __name__ == "__main__":
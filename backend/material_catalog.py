@@ -0,0 +1,147 @@
+"""
+Catálogo de Materiales en Memoria (Pyrolysis Hub).
+Carga la tabla `materials` una sola vez en una matriz densa de propiedades
+(PROPERTY_COLUMNS por material + índice id -> fila) compartida por todo el proceso.
+
+El snapshot se invalida:
+  - al confirmar cambios sobre Material en una sesión: el evento se publica en el bus de
+    invalidación (canal "materials"), así que todos los workers recargan;
+  - cuando cambia la huella barata de la tabla (count, max(created_at)), comprobada como mucho
+    cada MATERIAL_CATALOG_CHECK_SECONDS: cubre escrituras de otros procesos (p. ej. init_db.py).
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event, func, select
+
+from config import settings
+from database import SessionLocal
+from invalidation_bus import invalidation_bus
+from models import Material
+from schemas import Material as MaterialSchema
+from pyrolysis_engine import build_property_matrix
+
+CHANNEL_MATERIALS = "materials"
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Immutable view of the materials table. Replaced as a whole on refresh, never mutated.
+    """
+    version: int
+    properties: np.ndarray          # (M x 8) in PROPERTY_COLUMNS order
+    index: Dict[str, int]           # material id -> row in `properties`
+    materials: List[Dict[str, Any]] # serialized rows for /api/materials
+    source: Tuple[int, Any] = (0, None)  # (count, max(created_at)) of the table when loaded
+
+
+class MaterialCatalog:
+    """
+    Process-wide, lazily (re)loaded material snapshot.
+    """
+
+    def __init__(self, session_factory=SessionLocal, check_interval: float = 5.0):
+        self._session_factory = session_factory
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._version = 0
+        self._checked_at = 0.0
+        self._listeners: List[Callable[[], None]] = []
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def snapshot(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and not self._stale(snapshot):
+            return snapshot
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._load()
+            return self._snapshot
+
+    def _stale(self, snapshot: CatalogSnapshot) -> bool:
+        """
+        Compares the table fingerprint with the snapshot's, at most once per check_interval.
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now  # concurrent readers keep the snapshot meanwhile
+        db = self._session_factory()
+        try:
+            source = self._source(db)
+        finally:
+            db.close()
+        if source == snapshot.source:
+            return False
+        self.invalidate()
+        return True
+
+    def add_invalidation_listener(self, callback: Callable[[], None]):
+        """
+        Registers a callback run after every invalidation (e.g. to clear derived caches).
+        """
+        self._listeners.append(callback)
+
+    def invalidate(self):
+        """
+        Drops the current snapshot; the next reader reloads it from the database.
+        """
+        with self._lock:
+            self._snapshot = None
+            self._version += 1
+        for callback in self._listeners:
+            callback()
+
+    @staticmethod
+    def _source(db) -> Tuple[int, Any]:
+        return tuple(db.execute(select(func.count(Material.id), func.max(Material.created_at))).one())
+
+    def _load(self) -> CatalogSnapshot:
+        db = self._session_factory()
+        try:
+            source = self._source(db)
+            materials = db.query(Material).all()
+            properties, index = build_property_matrix(materials)
+            serialized = [MaterialSchema.model_validate(m).model_dump() for m in materials]
+        finally:
+            db.close()
+        return CatalogSnapshot(
+            version=self._version,
+            properties=properties,
+            index=index,
+            materials=serialized,
+            source=source,
+        )
+
+
+material_catalog = MaterialCatalog(check_interval=settings.MATERIAL_CATALOG_CHECK_SECONDS)
+invalidation_bus.subscribe(CHANNEL_MATERIALS, lambda key: material_catalog.invalidate())
+
+
+# --- INVALIDATION ON WRITE ---
+# Flag the session when it flushes Material changes and publish only after the commit,
+# so no worker can reload the snapshot from data that is not yet visible.
+
+@event.listens_for(SessionLocal, "before_flush")
+def _track_material_writes(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Material):
+            session.info["materials_changed"] = True
+            return
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("materials_changed", False):
+        invalidation_bus.publish(CHANNEL_MATERIALS)
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _reset_on_rollback(session):
+    session.info.pop("materials_changed", None)
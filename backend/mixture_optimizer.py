@@ -0,0 +1,127 @@
+"""
+Optimizador de Mezclas (Pyrolysis Hub).
+Los rendimientos y la eficiencia del modelo cinético son afines en los promedios
+ponderados de la mezcla, así que (con la suma de yields fija en 100%) el valor de una
+mezcla es la combinación convexa del valor de cada material puro. Maximizar un
+rendimiento bajo límites de contaminantes es por tanto un programa lineal.
+El modelo puede dar un rendimiento negativo para un material puro (p. ej. gas = 100 - oil - char),
+así que cada rendimiento de la mezcla se restringe a >= 0.
+Un modelo de reactor no afín en los promedios rompe esta propiedad.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy.optimize import linprog
+
+from pyrolysis_engine import DEFAULT_REACTOR, PROPERTY_COLUMNS, get_reactor, mode_code, simulate_arrays
+
+OBJECTIVES = ("oil", "char", "gas", "efficiency")
+YIELDS = ("oil", "char", "gas")
+
+# Slack below which a constraint is reported as binding (in the constraint's own units)
+BINDING_TOLERANCE = 1e-6
+# The warnings fire on avg > limit; solving slightly inside keeps float noise from tripping them
+LIMIT_MARGIN = 1e-9
+
+
+class InfeasibleMixtureError(ValueError):
+    pass
+
+
+def material_coefficients(properties: np.ndarray, pyrolysis_mode: str, atmosphere: str, residence_time: float,
+                          reactor_type: str = DEFAULT_REACTOR) -> Dict[str, np.ndarray]:
+    """
+    Evaluates the kernel once per pure material: the per-material objective coefficients.
+    """
+    n_materials = properties.shape[0]
+    out = simulate_arrays(
+        np.eye(n_materials) * 100,
+        properties,
+        np.full(n_materials, mode_code(pyrolysis_mode), dtype=np.int8),
+        np.full(n_materials, atmosphere == "STEAM", dtype=bool),
+        np.full(n_materials, residence_time, dtype=np.float64),
+        get_reactor(reactor_type).yield_model,
+    )
+    return {name: out[name] for name in OBJECTIVES}
+
+
+def optimize_mixture(
+    properties: np.ndarray,
+    material_ids: List[str],
+    objective: str,
+    pyrolysis_mode: str,
+    atmosphere: str,
+    residence_time: float,
+    max_averages: Dict[str, float],
+    min_percent: Optional[Dict[str, float]] = None,
+    max_percent: Optional[Dict[str, float]] = None,
+    reactor_type: str = DEFAULT_REACTOR,
+) -> Dict:
+    """
+    Solves max objective(x) s.t. sum(x) = 100%, bounds per material and
+    weighted-average limits (e.g. {"cl": 0.1, "s": 0.5}).
+
+    Args:
+        properties: (K x 8) properties of the candidate materials, in `material_ids` order.
+
+    Returns:
+        Dict with `percents` (K,), `objective_value` and `binding_constraints`.
+
+    Raises:
+        InfeasibleMixtureError: no mixture satisfies the constraints.
+        ValueError: unknown objective, constrained property or reactor type.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Objetivo desconocido: {objective}")
+    unknown = [k for k in max_averages if k not in PROPERTY_COLUMNS]
+    if unknown:
+        raise ValueError(f"Propiedades desconocidas: {', '.join(unknown)}")
+
+    min_percent = min_percent or {}
+    max_percent = max_percent or {}
+    all_coefficients = material_coefficients(properties, pyrolysis_mode, atmosphere, residence_time, reactor_type)
+    coefficients = all_coefficients[objective]
+
+    # Weighted averages are linear in the fractions: avg_k = sum_j x_j * P[j, k]
+    limit_names = list(max_averages)
+    columns = [PROPERTY_COLUMNS.index(name) for name in limit_names]
+    # So are the yields: -yield(x) <= 0 keeps every one of them physically valid
+    a_ub = np.vstack([properties[:, columns].T] + [-all_coefficients[name] for name in YIELDS])
+    b_ub = np.array([max_averages[name] - LIMIT_MARGIN for name in limit_names] + [0.0] * len(YIELDS))
+
+    bounds = [(min_percent.get(m, 0) / 100, max_percent.get(m, 100) / 100) for m in material_ids]
+
+    result = linprog(
+        -coefficients,
+        A_ub=a_ub,
+        b_ub=b_ub,
+        A_eq=np.ones((1, len(material_ids))),
+        b_eq=[1.0],
+        bounds=bounds,
+        method="highs",
+    )
+    if result.status == 2:
+        raise InfeasibleMixtureError("No existe una mezcla que cumpla las restricciones")
+    if not result.success:
+        raise ValueError(f"El optimizador no convergió: {result.message}")
+
+    fractions = np.clip(result.x, 0, 1)
+
+    binding = []
+    for name, slack in zip(limit_names, result.slack):
+        if slack <= BINDING_TOLERANCE + LIMIT_MARGIN:
+            binding.append(f"{name} <= {max_averages[name]}")
+    for name, slack in zip(YIELDS, result.slack[len(limit_names):]):
+        if slack <= BINDING_TOLERANCE:
+            binding.append(f"{name} >= 0")
+    for material_id, (low, high), x in zip(material_ids, bounds, fractions):
+        if max_percent.get(material_id, 0) > 0 and x >= high - BINDING_TOLERANCE:
+            binding.append(f"{material_id} <= {max_percent[material_id]}%")
+        if min_percent.get(material_id, 0) > 0 and x <= low + BINDING_TOLERANCE:
+            binding.append(f"{material_id} >= {min_percent[material_id]}%")
+
+    return {
+        "percents": fractions * 100,
+        "objective_value": float(coefficients @ fractions),
+        "binding_constraints": binding,
+    }
@@ -1,7 +1,8 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Table, Text, JSON
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Date, DateTime, Table, Text, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from uuid import uuid4
+from datetime import datetime, timezone
 from database import Base
 
 # Association Table for Many-to-Many relationship between Users and Roles
@@ -38,6 +39,7 @@ class User(Base):
     token_version = Column(Integer, default=1)
     
     last_login_at = Column(DateTime(timezone=True), nullable=True)
+    last_seen_at = Column(DateTime(timezone=True), nullable=True)  # Written in batches by activity_tracker
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
@@ -77,11 +79,41 @@ class AuditLog(Base):
     action_type = Column(String, nullable=False, index=True)  # CREATE, UPDATE, DELETE, LOGIN, etc.
     details = Column(Text, nullable=True)  # JSON string or text description
     ip_address = Column(String, nullable=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    # Set from Python: SQLite's func.now() text has no microseconds and breaks keyset order
+    timestamp = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now())
+
+    # Keyset pagination (audit_query.py): newest first on (timestamp, id), optionally per filter
+    __table_args__ = (
+        Index("ix_audit_logs_timestamp_id", "timestamp", "id"),
+        Index("ix_audit_logs_actor_timestamp_id", "actor_id", "timestamp", "id"),
+        Index("ix_audit_logs_action_timestamp_id", "action_type", "timestamp", "id"),
+        Index("ix_audit_logs_target_timestamp_id", "target_id", "timestamp", "id"),
+    )
 
     # Relationships
     actor = relationship("User", backref="audit_logs")
 
+class AuditHourlyCount(Base):
+    __tablename__ = "audit_hourly_counts"
+
+    # Rollup kept up to date by the audit writer (see audit_rollups.py)
+    action_type = Column(String, primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True)  # Start of the UTC hour
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index("ix_audit_hourly_counts_bucket", "bucket"),)
+
+class AuditActorDailyCount(Base):
+    __tablename__ = "audit_actor_daily_counts"
+
+    # Rollup kept up to date by the audit writer (see audit_rollups.py)
+    actor_id = Column(String, primary_key=True)  # "" = system actions (actor_id NULL)
+    day = Column(Date, primary_key=True)  # UTC
+    action_type = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (Index("ix_audit_actor_daily_counts_day", "day"),)
+
 class Material(Base):
     __tablename__ = "materials"
 
@@ -92,3 +124,13 @@ class Material(Base):
     properties = Column(JSON, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+
+class CacheInvalidation(Base):
+    __tablename__ = "cache_invalidations"
+
+    # Change feed polled by every worker (see invalidation_bus.py)
+    id = Column(Integer, primary_key=True, index=True)
+    channel = Column(String, nullable=False)  # e.g. "principals"
+    key = Column(String, nullable=True)  # Entry to drop; NULL = clear the whole cache
+    origin = Column(String, nullable=False)  # Publishing process, skipped by its own poller
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
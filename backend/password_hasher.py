@@ -0,0 +1,129 @@
+"""
+Password Hashing Pool (Auth).
+bcrypt is deliberately slow (~100s of ms of CPU per call). Running it inside the request
+threadpool lets a login burst occupy every AnyIO worker thread and stall unrelated sync
+endpoints. Hashing and verification run on a dedicated process pool instead, behind a
+bounded queue: when the queue is full, callers are rejected right away (503).
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from config import settings
+from security import get_password_hash, get_password_hashes, verify_password
+
+HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth",
+    "bcrypt operations submitted to the hashing pool and not finished yet",
+)
+HASH_LATENCY = Histogram(
+    "password_hash_seconds",
+    "Time from submission to completion of a bcrypt operation (queue wait included)",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0, 10.0),
+)
+HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "bcrypt operations rejected because the hashing queue was full",
+    ["operation"],
+)
+
+
+class HasherBusyError(RuntimeError):
+    pass
+
+
+class PasswordHasher:
+    """
+    Bounded process pool for passlib bcrypt.
+    """
+
+    def __init__(self, max_workers: int = 0, max_pending: int = 64, bulk_chunk_size: int = 8):
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+        self.max_pending = max_pending
+        self.bulk_chunk_size = bulk_chunk_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: the API process runs threads, forking it is not safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", get_password_hash, password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        Hashes a batch (bulk provisioning) in the order given. Chunks of `bulk_chunk_size`
+        run as one task each, at most `max_workers` chunks at a time: logins queued meanwhile
+        wait for one chunk, not for the whole batch.
+        """
+        size = self.bulk_chunk_size
+        chunks = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+        in_flight = asyncio.Semaphore(self.max_workers)
+
+        async def hash_chunk(chunk):
+            async with in_flight:
+                return await self._run("hash_bulk", get_password_hashes, chunk)
+
+        hashed = await asyncio.gather(*(hash_chunk(chunk) for chunk in chunks))
+        return [h for chunk in hashed for h in chunk]
+
+    async def _run(self, operation: str, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                HASH_REJECTED.labels(operation).inc()
+                raise HasherBusyError("Servicio de autenticación saturado. Intente de nuevo en unos segundos.")
+            self._pending += 1
+            HASH_QUEUE_DEPTH.set(self._pending)
+
+        started = time.perf_counter()
+        executor = self.executor
+        try:
+            return await asyncio.wrap_future(executor.submit(fn, *args))
+        except BrokenProcessPool:
+            # A worker died: drop the pool so the next call starts a fresh one
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            raise HasherBusyError("Servicio de autenticación reiniciándose. Intente de nuevo en unos segundos.")
+        finally:
+            HASH_LATENCY.labels(operation).observe(time.perf_counter() - started)
+            with self._lock:
+                self._pending -= 1
+                HASH_QUEUE_DEPTH.set(self._pending)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    bulk_chunk_size=settings.PASSWORD_HASH_BULK_CHUNK,
+)
@@ -0,0 +1,34 @@
+"""
+Permissions (Auth).
+Declarative per-route role checks: `Depends(require_roles("Academico"))` authorizes from the
+verified token's `roles` claim. get_current_user has already checked the token version
+against the principal cache and narrowed the claim to the roles the user still holds,
+so a removed role stops working at once and no route touches the ORM to authorize.
+"""
+from typing import Iterable, Optional
+
+from fastapi import Depends, HTTPException
+
+from auth_cache import Principal
+from dependencies import get_current_user
+
+ADMIN_ROLE = "Admin"
+
+
+def has_any_role(principal: Principal, roles: Iterable[str]) -> bool:
+    # Admin passes every check
+    return ADMIN_ROLE in principal.roles or any(role in principal.roles for role in roles)
+
+
+def require_roles(*roles: str, detail: Optional[str] = None):
+    """
+    Dependency factory: the route needs any of `roles` (or Admin). Returns the Principal.
+    """
+    message = detail or f"Se requiere rol de {' o '.join(roles)} para esta acción"
+
+    def dependency(current_user: Principal = Depends(get_current_user)) -> Principal:
+        if not has_any_role(current_user, roles):
+            raise HTTPException(status_code=403, detail=message)
+        return current_user
+
+    return dependency
@@ -0,0 +1,20 @@
+"""
+Motor de Pirólisis (Pyrolysis Hub).
+Núcleo cinético vectorizado e independiente de la API, registro de reactores y
+adaptadores SimulationRequest -> SimulationResult.
+"""
+from .kernel import (
+    PROPERTY_COLUMNS,
+    MODE_FAST,
+    MODE_SLOW,
+    MODE_FLASH,
+    YieldModel,
+    build_property_matrix,
+    extract_properties,
+    kinetic_yields,
+    mixture_weights,
+    mode_code,
+    simulate_arrays,
+)
+from .reactors import DEFAULT_REACTOR, Reactor, UnknownReactorError, get_reactor, reactor_names, register_reactor
+from .scenarios import iter_simulate_batch, simulate_batch, simulate_one, simulate_reactors
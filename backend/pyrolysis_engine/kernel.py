@@ -0,0 +1,170 @@
+"""
+Núcleo del Motor de Pirólisis (Pyrolysis Hub).
+Modelo cinético puro sobre arrays de NumPy: sin base de datos, sin pydantic, sin estado.
+Evalúa N escenarios de mezcla en una sola pasada; el modelo de rendimientos es enchufable
+(ver reactors.py).
+"""
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Column order of the material property matrix
+PROPERTY_COLUMNS = ("c", "h", "o", "n", "s", "cl", "ash", "moisture")
+C, H, O, N, S, CL, ASH, MOISTURE = range(len(PROPERTY_COLUMNS))
+
+# Pyrolysis mode codes (anything that is not FAST/SLOW uses the FLASH model)
+MODE_FAST, MODE_SLOW, MODE_FLASH = 0, 1, 2
+
+# Physical rules and contaminant limits
+FAST_MAX_RESIDENCE_TIME = 2.0
+CL_LIMIT = 0.1
+S_LIMIT = 0.5
+N_LIMIT = 1.0
+
+
+def extract_properties(props: Dict[str, Any]) -> List[float]:
+    """
+    Normaliza el JSON `properties` de un Material a una fila de PROPERTY_COLUMNS.
+    """
+    chon = props.get('c_h_o_n', {})
+    return [
+        chon.get('c', 0),
+        chon.get('h', 0),
+        chon.get('o', 0),
+        chon.get('n', 0),
+        props.get('s', 0),
+        props.get('cl', 0),
+        props.get('ash', 0),
+        props.get('moisture_default', 0),
+    ]
+
+
+def build_property_matrix(materials) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Builds the dense (M x 8) property matrix and the id -> row index for a list of Material rows.
+    """
+    index = {}
+    rows = []
+    for material in materials:
+        index[material.id] = len(rows)
+        rows.append(extract_properties(material.properties))
+    matrix = np.array(rows, dtype=np.float64).reshape(len(rows), len(PROPERTY_COLUMNS))
+    return matrix, index
+
+
+def mode_code(pyrolysis_mode: str) -> int:
+    if pyrolysis_mode == "FAST":
+        return MODE_FAST
+    if pyrolysis_mode == "SLOW":
+        return MODE_SLOW
+    return MODE_FLASH
+
+
+def mixture_weights(mixtures: Sequence[Sequence[Dict[str, Any]]], index: Dict[str, int], n_materials: int) -> np.ndarray:
+    """
+    Converts N mixtures ({id, percent} lists) into an (N x M) weight matrix.
+    Unknown material ids are ignored, exactly like the single-scenario endpoint.
+    """
+    rows, cols, values = [], [], []
+    for i, mixture in enumerate(mixtures):
+        for item in mixture:
+            col = index.get(item['id'])
+            if col is None:
+                continue
+            rows.append(i)
+            cols.append(col)
+            values.append(item['percent'])
+
+    weights = np.zeros((len(mixtures), n_materials), dtype=np.float64)
+    # np.add.at accumulates repeated materials inside the same mixture
+    np.add.at(weights, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), np.array(values, dtype=np.float64))
+    return weights
+
+
+# (avg, modes, steam, residence_times) -> raw (oil, char, gas), before normalization to 100%
+YieldModel = Callable[[np.ndarray, np.ndarray, np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray, np.ndarray]]
+
+
+def kinetic_yields(avg: np.ndarray, modes: np.ndarray, steam: np.ndarray,
+                   residence_times: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Modelo Cinético Simplificado (basado en ratios H/C y O/C).
+    H/C alto favorece volátiles (Oil/Gas). O/C alto baja valor calorífico.
+    """
+    avg_c, avg_h, avg_o, avg_ash = avg[:, C], avg[:, H], avg[:, O], avg[:, ASH]
+
+    fast = modes == MODE_FAST
+    slow = modes == MODE_SLOW
+    # Nested np.where instead of np.select: same result, far less per-call overhead at small N
+    oil = np.where(fast, 50 + (avg_h * 2) - (avg_o * 0.5) - (avg_ash * 1.5),
+                   np.where(slow, 20 + (avg_h * 1.5), 60 + (avg_h * 2)))
+    char = np.where(fast, 15 + (avg_c * 0.3) + avg_ash,
+                    np.where(slow, 35 + (avg_c * 0.5) + avg_ash, 10 + avg_ash))
+    gas = 100 - oil - char
+
+    # Ajuste por Atmósfera
+    gas = gas + np.where(steam, 10, 0)
+    oil = oil - np.where(steam, 5, 0)
+    char = char - np.where(steam, 5, 0)
+    return oil, char, gas
+
+
+def simulate_arrays(
+    weights: np.ndarray,
+    properties: np.ndarray,
+    modes: np.ndarray,
+    steam: np.ndarray,
+    residence_times: np.ndarray,
+    yield_model: YieldModel = kinetic_yields,
+) -> Dict[str, np.ndarray]:
+    """
+    Núcleo vectorizado del modelo cinético.
+
+    Args:
+        weights: (N x M) percent of each material per scenario.
+        properties: (M x 8) material property matrix (PROPERTY_COLUMNS order).
+        modes: (N,) requested mode codes (MODE_FAST / MODE_SLOW / MODE_FLASH).
+        steam: (N,) True where the atmosphere is STEAM.
+        residence_times: (N,) residence time in seconds.
+        yield_model: reactor-specific yield model (default: the base kinetic model).
+
+    Returns:
+        Dict of (N,) arrays: oil, char, gas, efficiency, the weighted averages
+        (avg, N x 8), the effective mode, and the boolean masks used for warnings.
+    """
+    # 1. Validación de Reglas Físicas (FAST con tiempos largos -> SLOW)
+    mode_adjusted = (modes == MODE_FAST) & (residence_times > FAST_MAX_RESIDENCE_TIME)
+    modes = np.where(mode_adjusted, MODE_SLOW, modes)
+
+    # 2. Promedios ponderados de la mezcla
+    mixture_mass = weights.sum(axis=1)
+    empty = mixture_mass == 0
+    safe_mass = np.where(empty, 1.0, mixture_mass)
+    avg = (weights @ properties) / safe_mass[:, None]
+
+    # 3. Rendimientos del reactor (el modo ya viene ajustado)
+    oil, char, gas = yield_model(avg, modes, steam, residence_times)
+
+    # Normalización final a 100%
+    total = oil + char + gas
+    oil = (oil / total) * 100
+    char = (char / total) * 100
+    gas = (gas / total) * 100
+
+    # Eficiencia (penalización por reacciones secundarias)
+    efficiency = 85 - (avg[:, MOISTURE] * 1.2)
+    efficiency = efficiency - np.where((residence_times > 10) & (modes == MODE_FAST), 10, 0)
+
+    return {
+        "oil": oil,
+        "char": char,
+        "gas": gas,
+        "efficiency": efficiency,
+        "avg": avg,
+        "modes": modes,
+        "empty": empty,
+        "mode_adjusted": mode_adjusted,
+        "cl_alert": avg[:, CL] > CL_LIMIT,
+        "s_alert": avg[:, S] > S_LIMIT,
+        "n_alert": avg[:, N] > N_LIMIT,
+    }
@@ -0,0 +1,56 @@
+"""
+Registro de Reactores (Pyrolysis Hub).
+Cada `reactorType` de SimulationRequest se resuelve aquí a su modelo vectorizado de
+rendimientos. Un reactor nuevo solo necesita un YieldModel y una llamada a register_reactor.
+"""
+from dataclasses import dataclass
+from typing import Dict, List
+
+from .kernel import YieldModel, kinetic_yields
+
+DEFAULT_REACTOR = "FIXED_BED"
+
+
+class UnknownReactorError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Reactor:
+    name: str
+    label: str
+    yield_model: YieldModel
+
+
+_REACTORS: Dict[str, Reactor] = {}
+
+
+def register_reactor(name: str, label: str, yield_model: YieldModel = kinetic_yields) -> Reactor:
+    """
+    Registers (or replaces) the yield model of a reactor type.
+
+    Sweep workers are separate processes: reactors registered at runtime in the API process
+    are not visible to them, so register at import time (in this module or one it imports).
+    """
+    reactor = Reactor(name=name, label=label, yield_model=yield_model)
+    _REACTORS[name] = reactor
+    return reactor
+
+
+def get_reactor(name: str) -> Reactor:
+    reactor = _REACTORS.get(name)
+    if reactor is None:
+        raise UnknownReactorError(f"Tipo de reactor desconocido: {name} (disponibles: {', '.join(_REACTORS)})")
+    return reactor
+
+
+def reactor_names() -> List[str]:
+    return list(_REACTORS)
+
+
+# Reactores del simulador. Todos usan el modelo cinético base hasta disponer de
+# datos de calibración propios de cada tecnología.
+register_reactor("FIXED_BED", "Lecho Fijo")
+register_reactor("FLUIDIZED", "Lecho Fluidizado")
+register_reactor("ROTARY", "Horno Rotatorio")
+register_reactor("AUGER", "Tornillo Sin Fin (Auger)")
@@ -0,0 +1,126 @@
+"""
+Adaptador de Escenarios (Pyrolysis Hub).
+Convierte listas de SimulationRequest en arrays para el núcleo, resuelve el reactor de
+cada escenario y construye los SimulationResult con sus advertencias y análisis.
+"""
+from typing import Dict, Iterator, List, Sequence
+
+import numpy as np
+
+from schemas import SimulationRequest, SimulationResult
+
+from .kernel import C, CL, H, N, S, mixture_weights, mode_code, simulate_arrays
+from .reactors import get_reactor
+
+
+def simulate_reactors(weights: np.ndarray, properties: np.ndarray, modes: np.ndarray, steam: np.ndarray,
+                      residence_times: np.ndarray, reactor_types: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    simulate_arrays with a per-scenario reactor: one kernel pass per distinct reactor type,
+    scattered back into scenario order.
+
+    Raises:
+        UnknownReactorError: a reactor type is not registered.
+    """
+    distinct = set(reactor_types)
+    if len(distinct) == 1:
+        return simulate_arrays(weights, properties, modes, steam, residence_times,
+                               get_reactor(distinct.pop()).yield_model)
+
+    types = np.array(reactor_types, dtype=object)
+    out: Dict[str, np.ndarray] = {}
+    for name in distinct:
+        rows = np.flatnonzero(types == name)
+        part = simulate_arrays(weights[rows], properties, modes[rows], steam[rows], residence_times[rows],
+                               get_reactor(name).yield_model)
+        for key, values in part.items():
+            if key not in out:
+                out[key] = np.empty((len(types),) + values.shape[1:], dtype=values.dtype)
+            out[key][rows] = values
+    return out
+
+
+def _scenario_warnings(i: int, residence_time: float, out: Dict[str, np.ndarray]) -> List[str]:
+    if out["empty"][i]:
+        return ["Mezcla vacía"]
+    warnings = []
+    avg = out["avg"][i]
+    if out["mode_adjusted"][i]:
+        warnings.append(f"Alerta de Proceso: La pirolisis rápida requiere tiempos < 2s (Actual: {residence_time}s). Se ha ajustado el modelo a Pirolisis Lenta para mayor precisión.")
+    if out["cl_alert"][i]:
+        warnings.append(f"ALERTA CRÍTICA: Contenido de Cloro ({avg[CL]:.2f}%) excede el límite seguro. Riesgo de corrosión y formación de dioxinas.")
+    if out["s_alert"][i]:
+        warnings.append(f"Advertencia Ambiental: Contenido de Azufre ({avg[S]:.2f}%) alto. Requiere tratamiento de gases (SOx).")
+    if out["n_alert"][i]:
+        warnings.append(f"Nota: Contenido de Nitrógeno ({avg[N]:.2f}%) puede generar NOx.")
+    return warnings
+
+
+def _scenario_analysis(avg_c: float, avg_h: float, oil: float, char: float) -> str:
+    analysis = f"Mezcla rica en Carbono ({avg_c:.1f}%) e Hidrógeno ({avg_h:.1f}%). "
+    if oil > 50:
+        analysis += "Alto potencial para Bio-combustibles líquidos."
+    elif char > 30:
+        analysis += "Excelente para producción de Biochar y secuestro de carbono."
+    else:
+        analysis += "Producción equilibrada de Syngas."
+    return analysis
+
+
+def simulate_batch(requests: Sequence[SimulationRequest], properties: np.ndarray, index: Dict[str, int]) -> List[SimulationResult]:
+    """
+    Evalúa una lista de SimulationRequest en una sola pasada vectorizada (una por tipo de reactor).
+    Los resultados se devuelven en el mismo orden que las solicitudes, que no se modifican.
+    """
+    if not requests:
+        return []
+
+    weights = mixture_weights([r.mixture for r in requests], index, properties.shape[0])
+    modes = np.array([mode_code(r.pyrolysisMode) for r in requests], dtype=np.int8)
+    steam = np.array([r.atmosphere == "STEAM" for r in requests], dtype=bool)
+    residence_times = np.array([r.residenceTime for r in requests], dtype=np.float64)
+
+    out = simulate_reactors(weights, properties, modes, steam, residence_times, [r.reactorType for r in requests])
+
+    # Back to Python scalars once, instead of per-element NumPy access
+    oil = out["oil"].tolist()
+    char = out["char"].tolist()
+    gas = out["gas"].tolist()
+    efficiency = out["efficiency"].tolist()
+    avg_c = out["avg"][:, C].tolist()
+    avg_h = out["avg"][:, H].tolist()
+    empty = out["empty"].tolist()
+    flagged = (out["mode_adjusted"] | out["empty"] | out["cl_alert"] | out["s_alert"] | out["n_alert"]).tolist()
+
+    # model_construct: the values are already well-typed, FastAPI validates them once on serialization
+    results = []
+    for i, request in enumerate(requests):
+        warnings = _scenario_warnings(i, request.residenceTime, out) if flagged[i] else []
+        if empty[i]:
+            results.append(SimulationResult.model_construct(yields={"oil": 0, "char": 0, "gas": 0}, efficiency=0, warnings=warnings, analysis="Sin datos"))
+            continue
+        results.append(SimulationResult.model_construct(
+            yields={
+                "oil": round(oil[i], 1),
+                "char": round(char[i], 1),
+                "gas": round(gas[i], 1)
+            },
+            efficiency=round(efficiency[i], 1),
+            warnings=warnings,
+            analysis=_scenario_analysis(avg_c[i], avg_h[i], oil[i], char[i])
+        ))
+    return results
+
+
+def iter_simulate_batch(requests: Sequence[SimulationRequest], properties: np.ndarray, index: Dict[str, int],
+                        block_size: int = 512) -> Iterator[SimulationResult]:
+    """
+    Streaming variant of simulate_batch: vectorizes block by block and yields results in
+    request order, so only one block of results is alive at a time.
+    """
+    for start in range(0, len(requests), block_size):
+        yield from simulate_batch(requests[start:start + block_size], properties, index)
+
+
+def simulate_one(request: SimulationRequest, properties: np.ndarray, index: Dict[str, int]) -> SimulationResult:
+    return simulate_batch([request], properties, index)[0]
@@ -0,0 +1,100 @@
+"""
+Refresh Tokens (Auth).
+Opaque, random refresh tokens stored only as SHA-256 digests in `refresh_tokens`.
+Every redemption rotates the token (the old row is deleted, a new one issued), so a
+token works once. Revocation: `revoke_tokens` bumps token_version and deletes the rows.
+"""
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import RefreshToken
+
+REFRESH_TOKEN_BYTES = 48
+# Oldest sessions beyond this count are dropped when a user logs in again
+MAX_TOKENS_PER_USER = 10
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_refresh_token(db: Session, user_id: str) -> str:
+    """
+    Stores a new refresh token for the user and returns it in clear (shown to the client once).
+    Expired and surplus tokens of the same user are removed in the same transaction.
+    """
+    now = datetime.utcnow()
+    db.query(RefreshToken).filter(
+        RefreshToken.user_id == user_id, RefreshToken.expires_at < now
+    ).delete(synchronize_session=False)
+
+    surplus = (
+        db.query(RefreshToken.id)
+        .filter(RefreshToken.user_id == user_id)
+        .order_by(RefreshToken.expires_at.desc())
+        .offset(MAX_TOKENS_PER_USER - 1)
+        .all()
+    )
+    if surplus:
+        db.query(RefreshToken).filter(RefreshToken.id.in_([row.id for row in surplus])).delete(synchronize_session=False)
+
+    token = secrets.token_urlsafe(REFRESH_TOKEN_BYTES)
+    db.add(RefreshToken(
+        token=hash_refresh_token(token),
+        user_id=user_id,
+        expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    db.commit()
+    return token
+
+
+def rotate_refresh_token(db: Session, token: str) -> Optional[Tuple[str, str]]:
+    """
+    Redeems a refresh token: deletes it and issues its replacement.
+
+    Returns:
+        (user_id, new_token), or None if the token is unknown, expired or was already redeemed.
+    """
+    digest = hash_refresh_token(token)
+    stored = db.query(RefreshToken.user_id, RefreshToken.expires_at).filter(RefreshToken.token == digest).first()
+    if stored is None:
+        return None
+
+    # The DELETE decides the race between two redemptions of the same token: one row, one winner
+    deleted = db.query(RefreshToken).filter(RefreshToken.token == digest).delete(synchronize_session=False)
+    if deleted != 1 or _as_naive_utc(stored.expires_at) < datetime.utcnow():
+        db.commit()
+        return None
+
+    return stored.user_id, issue_refresh_token(db, stored.user_id)
+
+
+def revoke_refresh_token(db: Session, token: str) -> bool:
+    deleted = db.query(RefreshToken).filter(RefreshToken.token == hash_refresh_token(token)).delete(synchronize_session=False)
+    db.commit()
+    return deleted == 1
+
+
+def revoke_user_refresh_tokens(db: Session, user_id: str) -> int:
+    """
+    Deletes every refresh token of the user. The caller commits.
+    """
+    return db.query(RefreshToken).filter(RefreshToken.user_id == user_id).delete(synchronize_session=False)
+
+
+def purge_expired_refresh_tokens(db: Session) -> int:
+    deleted = db.query(RefreshToken).filter(RefreshToken.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+def _as_naive_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes, Postgres aware ones
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
@@ -1,5 +1,5 @@
 from typing import List, Optional, Dict, Any
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import BaseModel, EmailStr, Field
 
 class RoleBase(BaseModel):
@@ -21,6 +21,8 @@ class User(UserBase):
     id: str
     token_version: int
     roles: List[Role] = []
+    last_login_at: Optional[datetime] = None
+    last_seen_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -28,6 +30,22 @@ class User(UserBase):
 class UserCreate(UserBase):
     password: str
 
+class BulkUserCreate(UserCreate):
+    roles: List[str] = [] # Role names, must exist
+
+class BulkUserCreated(BaseModel):
+    id: str
+    email: str
+
+class BulkUserSkipped(BaseModel):
+    row: int # 1-based position in the request (CSV: data line)
+    email: str
+    reason: str
+
+class BulkUserResult(BaseModel):
+    created: List[BulkUserCreated]
+    skipped: List[BulkUserSkipped]
+
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str
@@ -37,6 +55,10 @@ class TokenResponse(BaseModel):
     token_type: str
     roles: List[str]
     user_name: str
+    refresh_token: Optional[str] = None # Single-use: exchange it at /auth/refresh
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 # --- NEXO SYNERGIC BRIDGE SCHEMAS ---
 
@@ -71,6 +93,23 @@ class AuditLogResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class AuditHourlyCountResponse(BaseModel):
+    action_type: str
+    bucket: datetime
+    count: int
+
+    class Config:
+        from_attributes = True
+
+class AuditActorDailyCountResponse(BaseModel):
+    actor_id: Optional[str]  # None = system actions
+    day: date
+    action_type: str
+    count: int
+
+    class Config:
+        from_attributes = True
+
 class UserRoleUpdate(BaseModel):
     role_name: str
     action: str = Field(..., pattern="^(add|remove)$")
@@ -101,16 +140,150 @@ class SimulationResult(BaseModel):
     warnings: Optional[List[str]] = []
     analysis: Optional[str] = ""
 
+class SimulationBatchRequest(BaseModel):
+    """
+    N escenarios evaluados en una sola pasada vectorizada.
+    """
+    scenarios: List[SimulationRequest] = Field(..., max_length=100000)
+
+class MixtureOptimizationRequest(BaseModel):
+    """
+    Busca la mezcla que maximiza un rendimiento respetando límites de contaminantes.
+    """
+    objective: str = Field("oil", pattern="^(oil|char|gas|efficiency)$")
+    materials: Optional[List[str]] = None # Candidate material ids (default: whole catalog)
+    maxAverages: Dict[str, float] = {"cl": 0.1, "s": 0.5} # Limits on weighted averages: c, h, o, n, s, cl, ash, moisture
+    minPercent: Dict[str, float] = {} # Per-material lower bounds (material id -> %)
+    maxPercent: Dict[str, float] = {} # Per-material upper bounds (material id -> %)
+    reactorType: str = "FIXED_BED"
+    pyrolysisMode: str
+    atmosphere: str
+    residenceTime: float
+
+class MixtureOptimizationResult(BaseModel):
+    mixture: List[Dict[str, Any]] # List of {id: str, percent: float}
+    objective: str
+    objective_value: float
+    binding_constraints: List[str]
+    simulation: SimulationResult
+
+class SimulationSweepRequest(BaseModel):
+    """
+    Ejes de un barrido paramétrico: residenceTime × pyrolysisMode × atmosphere × fracción de mezcla.
+    La fracción de mezcla se da como vectores explícitos (`fractions`) o como rejilla del simplex (`fractionStep`).
+    """
+    reactorType: str = "FIXED_BED"
+    materials: List[str] = Field(..., min_length=1, max_length=8) # Material ids, column order of `fractions`
+    fractions: Optional[List[List[float]]] = None # Percent vectors, one per point of the mixture axis
+    fractionStep: Optional[float] = Field(None, gt=0, le=100) # e.g. 10 -> every composition in 10% steps
+    pyrolysisModes: List[str] = Field(..., min_length=1)
+    atmospheres: List[str] = Field(..., min_length=1)
+    residenceTimes: List[float] = Field(..., min_length=1)
+
+class SweepChunkStatus(BaseModel):
+    index: int
+    start: int
+    stop: int
+    status: str # PENDING, DONE, FAILED
+    elapsed_ms: Optional[float] = None
+
+class SweepResult(BaseModel):
+    """
+    Resultado compacto: arrays planos en orden C sobre `shape`
+    [residenceTimes, pyrolysisModes, atmospheres, fractions].
+    """
+    shape: List[int]
+    fractions: List[List[float]]
+    oil: List[float]
+    char: List[float]
+    gas: List[float]
+    efficiency: List[float]
+    warning_flags: List[int] # Bitmask: 1 modo ajustado, 2 Cl, 4 S, 8 N, 16 mezcla vacía
+
+class SweepJobStatus(BaseModel):
+    job_id: str
+    status: str # RUNNING, DONE, FAILED
+    total_points: int
+    completed_points: int
+    chunks: List[SweepChunkStatus]
+    error: Optional[str] = None
+    result: Optional[SweepResult] = None
+
+class KairosAssumptions(BaseModel):
+    """
+    Supuestos de mercado de la simulación de riesgos M5 (Monte Carlo).
+    """
+    feedstock_tonnes_per_year: float = Field(20000, gt=0)
+    oil_price_per_tonne: float = Field(600, gt=0) # €/t
+    price_uncertainty: float = Field(30, ge=0, le=100) # ± %
+    opex_per_year: float = Field(1_500_000, ge=0) # €
+    opex_uncertainty: float = Field(10, ge=0, le=100) # ± %
+    capex: float = Field(20_000_000, gt=0) # €
+    project_years: int = Field(10, ge=1, le=50)
+    cost_of_capital: float = Field(0.12, gt=-1, lt=1)
+    iterations: int = Field(5000, ge=100, le=1_000_000)
+    seed: Optional[int] = None
+
+class KairosMonteCarloRequest(KairosAssumptions):
+    yield_bio_oil: float = Field(..., ge=0, le=100)
+
+class KairosMonteCarloResult(BaseModel):
+    iterations: int
+    mean_irr: float # %
+    irr_percentiles: Dict[str, float] # p5, p25, p50, p75, p95 (%)
+    probability_irr_above_cost_of_capital: float # %
+    mean_npv: float
+    cost_of_capital: float # %
+    elapsed_ms: float
+
 class KairosRequest(BaseModel):
     user_query: str
     yield_bio_oil: float
-    avg_irr: float
-    profitability: float
+    avg_irr: Optional[float] = None # Ignored: the backend runs its own Monte Carlo
+    profitability: Optional[float] = None # Ignored: the backend runs its own Monte Carlo
+    assumptions: KairosAssumptions = KairosAssumptions()
 
 class KairosResponse(BaseModel):
     verdict: str
-    warnings: List[str]
-    analysis: str
+    warnings: List[str] = []
+    analysis: str = ""
+    simulation: Optional[KairosMonteCarloResult] = None
+
+# --- ACADEMIC RESEARCHER SCHEMAS ---
+
+class ExperimentAnalysisRequest(BaseModel):
+    """
+    Observaciones por grupo experimental: {grupo: [{kpi: valor}, ...]}.
+    """
+    groups: Dict[str, List[Dict[str, Optional[float]]]]
+    control_group: Optional[str] = None # Default: first group
+    kpis: Optional[List[str]] = None # Default: every KPI present
+
+class GroupStatistics(BaseModel):
+    # One value per KPI, aligned with ExperimentAnalysisResult.kpis
+    count: List[int]
+    mean: List[Optional[float]]
+    variance: List[Optional[float]]
+    std_dev: List[Optional[float]]
+    ci_low: List[Optional[float]]
+    ci_high: List[Optional[float]]
+
+class GroupComparison(BaseModel):
+    group: str
+    control: str
+    mean_difference: List[Optional[float]]
+    t_statistic: List[Optional[float]]
+    p_value: List[Optional[float]]
+    significant: List[bool]
+
+class ExperimentAnalysisResult(BaseModel):
+    kpis: List[str]
+    confidence_level: float
+    alpha: float
+    test_type: str
+    groups: Dict[str, GroupStatistics]
+    comparisons: List[GroupComparison]
+    warnings: List[str] = []
 
 # --- ASSISTANT SCHEMAS ---
 
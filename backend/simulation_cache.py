@@ -0,0 +1,111 @@
+"""
+Caché de Resultados de Simulación (Pyrolysis Hub).
+LRU acotado con expiración por TTL, indexado por un hash canónico de la solicitud
+(mezcla normalizada, modo, atmósfera, tiempo de residencia) y de las propiedades de los
+materiales de la mezcla en el catálogo: un cambio de propiedades cambia la clave en cualquier
+worker, sin depender de que la invalidación llegue a este proceso.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+from config import settings
+from schemas import SimulationRequest, SimulationResult
+
+PERCENT_DECIMALS = 3
+RESIDENCE_TIME_DECIMALS = 3
+
+
+def canonical_key(request: SimulationRequest, properties: np.ndarray, index: Dict[str, int]) -> str:
+    """
+    Hash of the normalized request: duplicate ids merged, ids sorted, percents rounded, plus
+    the catalog properties of each mixed material (None if unknown).
+    Two requests with the same key produce the same SimulationResult.
+    """
+    mixture = {}
+    for item in request.mixture:
+        mixture[item['id']] = mixture.get(item['id'], 0.0) + float(item['percent'])
+    canonical = {
+        "mixture": [[material_id, round(mixture[material_id], PERCENT_DECIMALS)] for material_id in sorted(mixture)],
+        "reactorType": request.reactorType,
+        "pyrolysisMode": request.pyrolysisMode,
+        "atmosphere": request.atmosphere,
+        "residenceTime": round(float(request.residenceTime), RESIDENCE_TIME_DECIMALS),
+        "properties": [properties[index[material_id]].tolist() if material_id in index else None
+                       for material_id in sorted(mixture)],
+    }
+    payload = json.dumps(canonical, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SimulationCache:
+    """
+    Thread-safe LRU + TTL cache of SimulationResult objects.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[SimulationResult]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, result = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: str, result: SimulationResult):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+simulation_cache = SimulationCache(
+    max_entries=settings.SIMULATION_CACHE_SIZE,
+    ttl_seconds=settings.SIMULATION_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,408 @@
+"""
+Motor de Barridos Paramétricos (Pyrolysis Hub).
+Evalúa rejillas residenceTime × pyrolysisMode × atmosphere × fracción de mezcla
+repartiendo el rango plano de puntos en bloques sobre un pool de procesos.
+Cada bloque reconstruye sus propios índices de rejilla, así que solo viajan los ejes.
+
+El estado y el resultado de cada barrido se escriben en SWEEP_JOBS_DIR (SweepJobStore): con
+`uvicorn --workers N` la consulta GET /api/simulate/sweep/{job_id} puede llegar a cualquier worker.
+"""
+import json
+import logging
+import math
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+import numpy as np
+
+from config import settings
+from pyrolysis_engine import DEFAULT_REACTOR, get_reactor, mode_code, simulate_arrays
+
+logger = logging.getLogger(__name__)
+
+# Warning bitmask stored per grid point
+WARN_MODE_ADJUSTED = 1
+WARN_CHLORINE = 2
+WARN_SULFUR = 4
+WARN_NITROGEN = 8
+WARN_EMPTY = 16
+
+MIN_CHUNK_POINTS = 1024
+CHUNKS_PER_WORKER = 4
+# Streaming keeps chunks small and bounds how many are in flight, so memory stays flat
+STREAM_CHUNK_POINTS = 8192
+STREAM_IN_FLIGHT_PER_WORKER = 2
+
+
+def _divisions(step: float) -> int:
+    divisions = 100 / step
+    if abs(divisions - round(divisions)) > 1e-9:
+        raise ValueError("fractionStep debe dividir 100 en partes enteras")
+    return int(round(divisions))
+
+
+def simplex_size(n_materials: int, step: float) -> int:
+    """
+    Number of points simplex_grid() would build, without building them (stars and bars).
+    """
+    return math.comb(_divisions(step) + n_materials - 1, n_materials - 1)
+
+
+def simplex_grid(n_materials: int, step: float) -> np.ndarray:
+    """
+    Every composition of `n_materials` percentages that sums to 100 in increments of `step`,
+    in lexicographic order. Check simplex_size() against the point limit first.
+    """
+    divisions = _divisions(step)
+
+    # One column per material: every row is expanded by all values its remaining share allows
+    parts = np.zeros((1, 0), dtype=np.int64)
+    remaining = np.array([divisions], dtype=np.int64)
+    for _ in range(n_materials - 1):
+        counts = remaining + 1
+        rows = np.repeat(np.arange(len(remaining)), counts)
+        values = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        parts = np.column_stack([parts[rows], values])
+        remaining = remaining[rows] - values
+    return np.column_stack([parts, remaining]).astype(np.float64) * step
+
+
+def run_chunk(properties: np.ndarray, fractions: np.ndarray, modes: np.ndarray, steam: np.ndarray,
+              residence_times: np.ndarray, start: int, stop: int,
+              reactor_type: str = DEFAULT_REACTOR) -> Dict[str, np.ndarray]:
+    """
+    Worker entry point: simulates the flat grid range [start, stop).
+
+    Args:
+        properties: (K x 8) properties of the K swept materials only.
+        fractions: (F x K) percent vectors of the mixture axis.
+        modes, steam, residence_times: the remaining axis values.
+        reactor_type: registered reactor whose yield model is evaluated.
+    """
+    shape = (len(residence_times), len(modes), len(steam), len(fractions))
+    r, p, a, f = np.unravel_index(np.arange(start, stop), shape)
+
+    out = simulate_arrays(fractions[f], properties, modes[p], steam[a], residence_times[r],
+                          get_reactor(reactor_type).yield_model)
+
+    flags = (
+        out["mode_adjusted"] * WARN_MODE_ADJUSTED
+        | out["cl_alert"] * WARN_CHLORINE
+        | out["s_alert"] * WARN_SULFUR
+        | out["n_alert"] * WARN_NITROGEN
+    ).astype(np.uint8)
+    empty = out["empty"]
+    flags = np.where(empty, WARN_EMPTY, flags).astype(np.uint8)
+
+    return {
+        "oil": np.where(empty, 0, out["oil"]).astype(np.float32),
+        "char": np.where(empty, 0, out["char"]).astype(np.float32),
+        "gas": np.where(empty, 0, out["gas"]).astype(np.float32),
+        "efficiency": np.where(empty, 0, out["efficiency"]).astype(np.float32),
+        "warning_flags": flags,
+    }
+
+
+class SweepJob:
+    """
+    One submitted grid: chunk futures plus the preallocated result arrays they fill.
+    """
+
+    RESULT_FIELDS = ("oil", "char", "gas", "efficiency", "warning_flags")
+
+    def __init__(self, shape, fractions: np.ndarray, bounds: List[tuple], on_update=None):
+        self.id = str(uuid4())
+        self.shape = shape
+        self.fractions = fractions
+        self.total_points = int(np.prod(shape))
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.arrays = {
+            name: np.zeros(self.total_points, dtype=np.uint8 if name == "warning_flags" else np.float32)
+            for name in self.RESULT_FIELDS
+        }
+        self.chunks = [
+            {"index": i, "start": start, "stop": stop, "status": "PENDING", "elapsed_ms": None}
+            for i, (start, stop) in enumerate(bounds)
+        ]
+        self._lock = threading.Lock()
+        self._pending = len(bounds)
+        self._submitted_at = time.perf_counter()
+        self._on_update = on_update
+        self.done = threading.Event()
+
+    @property
+    def status(self) -> str:
+        if self.error:
+            return "FAILED"
+        return "DONE" if self.done.is_set() else "RUNNING"
+
+    @property
+    def completed_points(self) -> int:
+        return sum(c["stop"] - c["start"] for c in self.chunks if c["status"] == "DONE")
+
+    def chunk_finished(self, index: int, future):
+        chunk = self.chunks[index]
+        with self._lock:
+            try:
+                result = future.result()
+                for name in self.RESULT_FIELDS:
+                    self.arrays[name][chunk["start"]:chunk["stop"]] = result[name]
+                chunk["status"] = "DONE"
+            except Exception as e:
+                chunk["status"] = "FAILED"
+                self.error = f"Bloque {index} falló: {e}"
+            chunk["elapsed_ms"] = round((time.perf_counter() - self._submitted_at) * 1000, 1)
+            self._pending -= 1
+            if self._pending == 0:
+                self.finished_at = time.time()
+                self.done.set()
+            if self._on_update:
+                self._on_update(self)
+
+
+class StoredSweepJob:
+    """
+    A job read back from SweepJobStore, possibly run by another worker. Same attributes as
+    SweepJob; the result arrays are loaded on first access.
+    """
+
+    def __init__(self, data: dict, result_path: str):
+        self.id = data["id"]
+        self.status = data["status"]
+        self.shape = tuple(data["shape"])
+        self.total_points = data["total_points"]
+        self.completed_points = data["completed_points"]
+        self.chunks = data["chunks"]
+        self.error = data["error"]
+        self._result_path = result_path
+        self._result: Optional[Dict[str, np.ndarray]] = None
+
+    def _load_result(self) -> Dict[str, np.ndarray]:
+        if self._result is None:
+            with np.load(self._result_path) as result:
+                self._result = {name: result[name] for name in result.files}
+        return self._result
+
+    @property
+    def fractions(self) -> np.ndarray:
+        return self._load_result()["fractions"]
+
+    @property
+    def arrays(self) -> Dict[str, np.ndarray]:
+        result = self._load_result()
+        return {name: result[name] for name in SweepJob.RESULT_FIELDS}
+
+
+class SweepJobStore:
+    """
+    Status (`<id>.json`, rewritten after every chunk) and result (`<id>.npz`, written before
+    the final status) of each job in a directory shared by the workers of the host.
+    Keeps the newest `max_jobs` jobs.
+    """
+
+    def __init__(self, directory: str, max_jobs: int = 32):
+        self.directory = directory
+        self.max_jobs = max_jobs
+
+    def _path(self, job_id: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.{extension}")
+
+    def save(self, job: SweepJob):
+        os.makedirs(self.directory, exist_ok=True)
+        if job.status == "DONE":
+            tmp = self._path(job.id, "npz.tmp")
+            with open(tmp, "wb") as f:
+                np.savez(f, fractions=job.fractions, **job.arrays)
+            os.replace(tmp, self._path(job.id, "npz"))
+
+        data = {
+            "id": job.id,
+            "status": job.status,
+            "shape": list(job.shape),
+            "total_points": job.total_points,
+            "completed_points": job.completed_points,
+            "chunks": job.chunks,
+            "error": job.error,
+        }
+        tmp = self._path(job.id, "json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self._path(job.id, "json"))
+
+    def load(self, job_id: str) -> Optional[StoredSweepJob]:
+        try:
+            job_id = str(UUID(job_id))  # never a path
+            with open(self._path(job_id, "json"), encoding="utf-8") as f:
+                data = json.load(f)
+        except (ValueError, OSError):
+            return None
+        return StoredSweepJob(data, self._path(job_id, "npz"))
+
+    def prune(self):
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith(".json")]
+        except FileNotFoundError:
+            return
+        paths = sorted((os.path.join(self.directory, n) for n in names), key=os.path.getmtime, reverse=True)
+        for path in paths[self.max_jobs:]:
+            for stale in (path, path[:-len("json")] + "npz"):
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+
+
+class SweepEngine:
+    """
+    Owns the process pool and the in-memory registry of sweep jobs.
+    """
+
+    def __init__(self, max_workers: int = 0, max_points: int = 5_000_000, max_jobs: int = 32,
+                 store: Optional[SweepJobStore] = None):
+        # Every uvicorn worker has its own pool: share the CPUs among WEB_CONCURRENCY workers
+        api_workers = max(1, int(os.environ.get("WEB_CONCURRENCY") or 1))
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 1) // api_workers)
+        self.max_points = max_points
+        self.max_jobs = max_jobs
+        self.store = store
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[str, SweepJob] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: the API process runs threads, forking it is not safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def partition(self, total_points: int, max_chunk_points: Optional[int] = None) -> List[tuple]:
+        n_chunks = max(1, min(self.max_workers * CHUNKS_PER_WORKER, math.ceil(total_points / MIN_CHUNK_POINTS)))
+        if max_chunk_points:
+            n_chunks = max(n_chunks, math.ceil(total_points / max_chunk_points))
+        size = math.ceil(total_points / n_chunks)
+        return [(start, min(start + size, total_points)) for start in range(0, total_points, size)]
+
+    def _axes(self, fractions: np.ndarray, pyrolysis_modes: List[str], atmospheres: List[str],
+              residence_times: List[float], reactor_type: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, tuple]:
+        get_reactor(reactor_type)  # unknown reactor types fail here, not in a worker
+        modes = np.array([mode_code(m) for m in pyrolysis_modes], dtype=np.int8)
+        steam = np.array([a == "STEAM" for a in atmospheres], dtype=bool)
+        residence = np.array(residence_times, dtype=np.float64)
+        shape = (len(residence), len(modes), len(steam), len(fractions))
+
+        self.check_size(int(np.prod(shape)))
+        return modes, steam, residence, shape
+
+    def check_size(self, total_points: int):
+        if total_points > self.max_points:
+            raise ValueError(f"La rejilla tiene {total_points} puntos (máximo {self.max_points})")
+
+    def submit(self, properties: np.ndarray, fractions: np.ndarray, pyrolysis_modes: List[str],
+               atmospheres: List[str], residence_times: List[float],
+               reactor_type: str = DEFAULT_REACTOR) -> SweepJob:
+        """
+        Partitions the grid and fans the chunks out over the process pool.
+
+        Args:
+            properties: (K x 8) properties of the swept materials, in `fractions` column order.
+            fractions: (F x K) percent vectors of the mixture axis.
+        """
+        modes, steam, residence, shape = self._axes(fractions, pyrolysis_modes, atmospheres, residence_times, reactor_type)
+
+        job = SweepJob(shape, fractions, self.partition(int(np.prod(shape))), on_update=self._publish)
+        self._register(job)
+        self._publish(job)
+        for chunk in job.chunks:
+            future = self.executor.submit(run_chunk, properties, fractions, modes, steam, residence,
+                                          chunk["start"], chunk["stop"], reactor_type)
+            future.add_done_callback(lambda fut, i=chunk["index"]: job.chunk_finished(i, fut))
+        return job
+
+    def stream(self, properties: np.ndarray, fractions: np.ndarray, pyrolysis_modes: List[str],
+               atmospheres: List[str], residence_times: List[float],
+               reactor_type: str = DEFAULT_REACTOR) -> Iterator[Tuple[int, int, Dict[str, np.ndarray]]]:
+        """
+        Same grid as `submit`, but yields (start, stop, arrays) per chunk as soon as it completes.
+        Only a bounded window of small chunks is in flight; nothing is kept once consumed.
+        Chunks arrive in completion order, not grid order.
+        """
+        modes, steam, residence, shape = self._axes(fractions, pyrolysis_modes, atmospheres, residence_times, reactor_type)
+        bounds = iter(self.partition(int(np.prod(shape)), max_chunk_points=STREAM_CHUNK_POINTS))
+        in_flight = {}
+
+        def submit_next():
+            chunk = next(bounds, None)
+            if chunk is not None:
+                future = self.executor.submit(run_chunk, properties, fractions, modes, steam, residence, *chunk, reactor_type)
+                in_flight[future] = chunk
+
+        for _ in range(self.max_workers * STREAM_IN_FLIGHT_PER_WORKER):
+            submit_next()
+        try:
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start, stop = in_flight.pop(future)
+                    submit_next()
+                    yield start, stop, future.result()
+        finally:
+            # Client went away: drop whatever has not started yet
+            for future in in_flight:
+                future.cancel()
+
+    def get(self, job_id: str):
+        """
+        The job if this worker runs it, else its last state in the shared store.
+        """
+        job = self._jobs.get(job_id)
+        if job is None and self.store is not None:
+            job = self.store.load(job_id)
+        return job
+
+    def _publish(self, job: SweepJob):
+        if self.store is None:
+            return
+        try:
+            self.store.save(job)
+            if job.done.is_set():
+                self.store.prune()
+        except OSError as e:
+            logger.error(f"No se pudo guardar el barrido {job.id}: {e}")
+
+    def _register(self, job: SweepJob):
+        with self._lock:
+            # Evict the oldest finished jobs once the registry is full
+            finished = sorted((j for j in self._jobs.values() if j.done.is_set()), key=lambda j: j.created_at)
+            while len(self._jobs) >= self.max_jobs and finished:
+                self._jobs.pop(finished.pop(0).id, None)
+            if len(self._jobs) >= self.max_jobs:
+                raise ValueError("Demasiados barridos en curso. Intente más tarde.")
+            self._jobs[job.id] = job
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+sweep_engine = SweepEngine(
+    max_workers=settings.SWEEP_MAX_WORKERS,
+    max_points=settings.SWEEP_MAX_POINTS,
+    max_jobs=settings.SWEEP_MAX_JOBS,
+    store=SweepJobStore(settings.SWEEP_JOBS_DIR or os.path.join(tempfile.gettempdir(), "nexo_sweeps"),
+                        max_jobs=settings.SWEEP_MAX_JOBS),
+)
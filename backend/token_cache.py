@@ -0,0 +1,84 @@
+"""
+Verified-Token Cache (Auth).
+The SPA sends the same bearer token on every request. The claims of a token whose signature
+and expiry were verified once are kept, keyed by its SHA-256 digest, until the token's own
+`exp`: repeat requests skip jwt.decode. Revocation is unaffected, since get_current_user
+still checks the `ver` claim against the principal cache on every request.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+from jose import jwt
+from prometheus_client import Counter, Gauge
+
+from config import settings
+from security import ALGORITHM, SECRET_KEY
+
+TOKEN_CACHE_LOOKUPS = Counter(
+    "jwt_decode_cache_lookups_total",
+    "Bearer token verifications by cache result",
+    ["result"],
+)
+
+
+class TokenCache:
+    """
+    Thread-safe LRU of verified JWT claims, each entry valid until the token's `exp`.
+    """
+
+    def __init__(self, max_entries: int = 10000, secret_key: str = SECRET_KEY, algorithm: str = ALGORITHM):
+        self.max_entries = max_entries
+        self._secret_key = secret_key
+        self._algorithm = algorithm
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        Verified claims of `token`. Raises jose.JWTError (invalid signature, expired...) like jwt.decode.
+        """
+        key = hashlib.sha256(token.encode("utf-8")).digest()
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    TOKEN_CACHE_LOOKUPS.labels("hit").inc()
+                    return entry[1]
+                del self._entries[key]
+            self.misses += 1
+        TOKEN_CACHE_LOOKUPS.labels("miss").inc()
+
+        claims = jwt.decode(token, self._secret_key, algorithms=[self._algorithm])
+        expires_at = claims.get("exp")
+        if isinstance(expires_at, (int, float)):
+            with self._lock:
+                self._entries[key] = (expires_at, claims)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return claims
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(max_entries=settings.TOKEN_CACHE_SIZE)
+
+TOKEN_CACHE_HIT_RATIO = Gauge(
+    "jwt_decode_cache_hit_ratio",
+    "Share of bearer token verifications served from the verified-token cache",
+)
+TOKEN_CACHE_HIT_RATIO.set_function(lambda: token_cache.hit_ratio)
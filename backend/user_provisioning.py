@@ -0,0 +1,165 @@
+"""
+User Provisioning (Admin Console).
+Bulk onboarding for /admin/users/bulk: parses a CSV or JSON list of users, finds the emails
+already registered with one IN query and inserts the new users and their role assignments
+with one executemany per table, in a single transaction.
+"""
+import csv
+import io
+import json
+from typing import Any, Dict, List, Tuple
+from uuid import uuid4
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from models import Role, User, user_roles
+from schemas import BulkUserCreate
+
+CSV_MEDIA_TYPES = ("text/csv", "application/csv")
+JSON_MEDIA_TYPES = ("application/json", "")
+CSV_REQUIRED_COLUMNS = ("email", "full_name", "password")
+CSV_ROLE_SEPARATOR = ";"
+
+
+class UnsupportedFormatError(ValueError):
+    pass
+
+
+class BulkUserFormatError(ValueError):
+    pass
+
+
+class BulkUserValidationError(ValueError):
+    """
+    Rows that do not validate, or name roles that do not exist. `errors` lists them.
+    """
+
+    def __init__(self, message: str, errors: List[Dict[str, Any]]):
+        super().__init__(message)
+        self.errors = errors
+
+
+def parse_bulk_users(body: bytes, content_type: str, max_rows: int) -> List[BulkUserCreate]:
+    """
+    Validates every row up front: one bad row rejects the whole request, listing all of them.
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in CSV_MEDIA_TYPES:
+        records = _csv_records(body)
+    elif media_type in JSON_MEDIA_TYPES:
+        records = _json_records(body)
+    else:
+        raise UnsupportedFormatError(f"Formato no soportado: {media_type} (text/csv o application/json)")
+
+    if not records:
+        raise BulkUserFormatError("La solicitud no contiene usuarios")
+    if len(records) > max_rows:
+        raise BulkUserFormatError(f"Demasiados usuarios: {len(records)} (máximo {max_rows} por solicitud)")
+
+    users, errors = [], []
+    for row, record in enumerate(records, start=1):
+        try:
+            users.append(BulkUserCreate.model_validate(record))
+        except ValidationError as e:
+            errors.append({
+                "row": row,
+                "errors": [f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()],
+            })
+    if errors:
+        raise BulkUserValidationError(f"{len(errors)} fila(s) inválida(s)", errors)
+    return users
+
+
+def _json_records(body: bytes) -> List[Any]:
+    try:
+        data = json.loads(body or b"null")
+    except ValueError as e:
+        raise BulkUserFormatError(f"JSON inválido: {e}")
+    if isinstance(data, dict):
+        data = data.get("users")
+    if not isinstance(data, list):
+        raise BulkUserFormatError('Se esperaba una lista de usuarios o {"users": [...]}')
+    return data
+
+
+def _csv_records(body: bytes) -> List[Dict[str, Any]]:
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise BulkUserFormatError("El CSV debe estar codificado en UTF-8")
+
+    reader = csv.DictReader(io.StringIO(text))
+    columns = [name.strip() for name in reader.fieldnames or []]
+    missing = [name for name in CSV_REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise BulkUserFormatError(f"Faltan columnas en el CSV: {', '.join(missing)}")
+
+    records = []
+    for raw in reader:
+        record = {key.strip(): (value or "").strip() for key, value in raw.items() if key is not None}
+        record["roles"] = [r.strip() for r in record.get("roles", "").split(CSV_ROLE_SEPARATOR) if r.strip()]
+        if not record.get("is_active"):
+            record.pop("is_active", None)
+        records.append(record)
+    return records
+
+
+def plan_bulk_users(db: Session, users: List[BulkUserCreate]) -> Tuple[List[Tuple[int, BulkUserCreate]], List[Dict[str, Any]], Dict[str, int]]:
+    """
+    One IN query for the emails already registered, one for the roles named.
+
+    Returns:
+        (rows to create with their 1-based position, skipped rows, role id by name).
+    """
+    taken = set(db.execute(select(User.email).where(User.email.in_({u.email for u in users}))).scalars())
+
+    role_names = {name for u in users for name in u.roles}
+    role_ids = dict(db.execute(select(Role.name, Role.id).where(Role.name.in_(role_names))).all()) if role_names else {}
+    unknown = sorted(role_names - role_ids.keys())
+    if unknown:
+        errors = [{"row": row, "errors": [f"roles: no existe el rol {', '.join(sorted(set(u.roles) - role_ids.keys()))}"]}
+                  for row, u in enumerate(users, start=1) if set(u.roles) - role_ids.keys()]
+        raise BulkUserValidationError(f"Roles inexistentes: {', '.join(unknown)}", errors)
+
+    to_create, skipped, seen = [], [], set()
+    for row, user in enumerate(users, start=1):
+        key = user.email.lower()
+        if user.email in taken:
+            skipped.append({"row": row, "email": user.email, "reason": "El email ya está registrado"})
+        elif key in seen:
+            skipped.append({"row": row, "email": user.email, "reason": "Email repetido en la solicitud"})
+        else:
+            seen.add(key)
+            to_create.append((row, user))
+    return to_create, skipped, role_ids
+
+
+def insert_bulk_users(db: Session, to_create: List[Tuple[int, BulkUserCreate]], password_hashes: List[str],
+                      role_ids: Dict[str, int]) -> List[Dict[str, str]]:
+    """
+    Inserts users and role assignments (one executemany each) and commits.
+    """
+    users = [
+        {
+            "id": str(uuid4()),
+            "email": user.email,
+            "full_name": user.full_name,
+            "password_hash": password_hash,
+            "is_active": user.is_active if user.is_active is not None else True,
+            "token_version": 1,
+        }
+        for (_, user), password_hash in zip(to_create, password_hashes)
+    ]
+    assignments = [
+        {"user_id": row["id"], "role_id": role_ids[name]}
+        for row, (_, user) in zip(users, to_create)
+        for name in dict.fromkeys(user.roles)
+    ]
+
+    db.execute(insert(User), users)
+    if assignments:
+        db.execute(insert(user_roles), assignments)
+    db.commit()
+    return [{"id": row["id"], "email": row["email"]} for row in users]
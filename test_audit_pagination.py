@@ -0,0 +1,137 @@
+print("Init...")
+import os
+import sys
+import tempfile
+import threading
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+WORK_DIR = tempfile.mkdtemp(prefix="nexo_audit_")
+SAME_SECOND = "2025-12-27 03:25:31"
+MIDNIGHT = "2025-12-26 00:00:00"
+
+# Throwaway SQLite database holding audit rows in the legacy func.now() format
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'audit.db')}"
+os.environ["AUDIT_ARCHIVE_DIR"] = os.path.join(WORK_DIR, "archive")
+sys.path.insert(0, BACKEND_DIR)
+
+from sqlalchemy import text
+
+from database import Base, SessionLocal, engine, normalize_sqlite_timestamps
+from models import AuditLog
+
+
+def print_step(step, message):
+    print(f"\n[{step}] {message}")
+    print("-" * 50)
+
+
+def seed_legacy_rows():
+    """
+    6 rows in one second and 1 at midnight, as server_default=func.now() wrote them
+    (second precision, no microseconds).
+    """
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for i in range(6):
+            conn.execute(text("INSERT INTO audit_logs (action_type, target_id, timestamp) VALUES ('LOGIN', :t, :ts)"),
+                         {"t": f"legacy-{i}", "ts": SAME_SECOND})
+        conn.execute(text("INSERT INTO audit_logs (action_type, target_id, timestamp) VALUES ('LOGIN', 'midnight', :ts)"),
+                     {"ts": MIDNIGHT})
+    normalized = normalize_sqlite_timestamps(AuditLog.__table__, "timestamp")
+    print(f"✅ {normalized} legacy timestamps normalized.")
+    return normalized == 7
+
+
+def check_keyset_pages():
+    """
+    Follows the cursor with limit=2: every row exactly once, and the walk ends.
+    """
+    from audit_query import AuditLogFilters, audit_log_page_query, encode_cursor
+
+    db = SessionLocal()
+    try:
+        seen, cursor = [], None
+        for _ in range(10):
+            logs = db.execute(audit_log_page_query(AuditLogFilters(), cursor, 2)).scalars().all()
+            seen += [log.id for log in logs[:2]]
+            if len(logs) <= 2:
+                break
+            cursor = encode_cursor(logs[1].timestamp, logs[1].id)
+        else:
+            print("❌ Pagination never reached the last page.")
+            return False
+    finally:
+        db.close()
+    if sorted(seen) != list(range(1, 8)) or len(seen) != 7:
+        print(f"❌ Pages returned ids {seen}")
+        return False
+    print(f"✅ 7 rows over {len(seen) // 2 + 1} pages, no repeats.")
+    return True
+
+
+def check_ranges_and_export():
+    from datetime import datetime
+
+    from audit_export import iter_hot_rows
+    from audit_query import AuditLogFilters, apply_filters
+    from sqlalchemy import func, select
+
+    since = datetime.fromisoformat(SAME_SECOND)
+    db = SessionLocal()
+    try:
+        in_range = db.execute(apply_filters(select(func.count()).select_from(AuditLog), AuditLogFilters(since=since))).scalar()
+    finally:
+        db.close()
+    exported = [row["id"] for row in iter_hot_rows(AuditLogFilters(), chunk_size=2)]
+    if in_range != 6 or sorted(exported) != list(range(1, 8)):
+        print(f"❌ since matched {in_range} rows (expected 6); export chunks returned {exported}")
+        return False
+    print("✅ since bound and chunked export see every same-second row.")
+    return True
+
+
+def check_archive_midnight():
+    """
+    The midnight row must be archived in its own day, not select nothing and loop.
+    """
+    from audit_archive import AuditArchive
+
+    archive = AuditArchive(os.environ["AUDIT_ARCHIVE_DIR"], retention_days=1, batch_size=2)
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(archive.run()), daemon=True)
+    worker.start()
+    worker.join(timeout=30)
+    if worker.is_alive():
+        print("❌ Retention run did not finish.")
+        return False
+    if result.get("archived") != 7 or result.get("deleted") != 7:
+        print(f"❌ Retention run: {result}")
+        return False
+    print(f"✅ Retention archived {result['archived']} rows in {result['segments']} day segments.")
+    return True
+
+
+def main():
+    print("🚀 Starting Audit Pagination Verification...")
+
+    print_step(1, "Legacy second-precision timestamps")
+    if not seed_legacy_rows():
+        sys.exit(1)
+
+    print_step(2, "Keyset pagination across one second")
+    if not check_keyset_pages():
+        sys.exit(1)
+
+    print_step(3, "since/until and export chunks")
+    if not check_ranges_and_export():
+        sys.exit(1)
+
+    print_step(4, "Retention of a row at midnight")
+    if not check_archive_midnight():
+        sys.exit(1)
+
+    print("\n🎉 ALL CHECKS PASSED! Audit keysets agree with stored timestamps.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+print("Init...")
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+WORKERS = 3
+PORT = 8765
+BASE_URL = f"http://localhost:{PORT}"
+EVENTS = 20
+# Budget for an event to reach every worker (poll interval is 20 ms by default)
+MAX_PROPAGATION_MS = 500
+
+# Throwaway SQLite database shared by every process of this test (spawned children inherit it)
+DB_PATH = os.environ.setdefault("NEXO_BUS_TEST_DB", os.path.join(tempfile.mkdtemp(prefix="nexo_bus_"), "bus.db"))
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["INVALIDATION_BUS"] = "database"
+sys.path.insert(0, BACKEND_DIR)
+
+
+def print_step(step, message):
+    print(f"\n[{step}] {message}")
+    print("-" * 50)
+
+
+def bus_worker(worker_id, ready, received):
+    """
+    One 'API worker': its own DatabaseInvalidationBus, reporting when each event arrives.
+    """
+    from invalidation_bus import DatabaseInvalidationBus
+
+    bus = DatabaseInvalidationBus()
+    bus.subscribe("test", lambda key: received.put((worker_id, key, time.time())))
+    bus.start()
+    ready.set()
+    time.sleep(EVENTS * 0.05 + 3)
+    bus.stop()
+
+
+def check_bus_propagation():
+    """
+    Spawns WORKERS processes, publishes EVENTS invalidations from this one and measures
+    how long each takes to reach every worker.
+    """
+    from database import Base, engine
+    from invalidation_bus import DatabaseInvalidationBus
+
+    Base.metadata.create_all(bind=engine)
+    ctx = multiprocessing.get_context("spawn")
+    received = ctx.Queue()
+    readies = [ctx.Event() for _ in range(WORKERS)]
+    processes = [ctx.Process(target=bus_worker, args=(i, readies[i], received)) for i in range(WORKERS)]
+    for p in processes:
+        p.start()
+    for ready in readies:
+        if not ready.wait(60):
+            print("❌ Worker failed to start.")
+            return False
+
+    publisher = DatabaseInvalidationBus()
+    sent = {}
+    for i in range(EVENTS):
+        key = f"user-{i}"
+        sent[key] = time.time()
+        publisher.publish("test", key)
+        time.sleep(0.05)
+
+    latencies = []
+    deliveries = set()
+    deadline = time.time() + 5
+    while len(deliveries) < WORKERS * EVENTS and time.time() < deadline:
+        try:
+            worker_id, key, at = received.get(timeout=0.5)
+        except Exception:
+            continue
+        deliveries.add((worker_id, key))
+        latencies.append((at - sent[key]) * 1000)
+
+    for p in processes:
+        p.join()
+
+    if len(deliveries) < WORKERS * EVENTS:
+        print(f"❌ Only {len(deliveries)}/{WORKERS * EVENTS} deliveries arrived.")
+        return False
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"✅ {len(deliveries)} deliveries to {WORKERS} workers: "
+          f"p50 {statistics.median(latencies):.1f} ms, p99 {p99:.1f} ms, max {latencies[-1]:.1f} ms")
+    return latencies[-1] <= MAX_PROPAGATION_MS
+
+
+def start_server():
+    print(f"🔧 Seeding {DB_PATH} and starting uvicorn with {WORKERS} workers...")
+    subprocess.run([sys.executable, "init_db.py"], cwd=BACKEND_DIR, check=True, capture_output=True)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT), "--workers", str(WORKERS)],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    for _ in range(120):
+        try:
+            requests.get(BASE_URL, timeout=1)
+            print("✅ Server is UP!")
+            return server
+        except requests.exceptions.ConnectionError:
+            time.sleep(1)
+    server.terminate()
+    return None
+
+
+def login(email, password):
+    response = requests.post(f"{BASE_URL}/auth/login", json={"email": email, "password": password})
+    return response.json()["access_token"] if response.status_code == 200 else None
+
+
+def protected_status(token):
+    # New connection per request so the kernel spreads them over the workers
+    return requests.get(f"{BASE_URL}/pyrolysis/simulation-data",
+                        headers={"Authorization": f"Bearer {token}", "Connection": "close"}).status_code
+
+
+def check_revocation_across_workers():
+    """
+    Warms the principal cache of every worker, revokes from one of them and measures how
+    long any worker keeps accepting the revoked token.
+    """
+    server = start_server()
+    if server is None:
+        print("❌ Server failed to start.")
+        return False
+    try:
+        scientist = login("cientifico@nexo.com", "ciencia123")
+        admin = login("admin@nexo.com", "admin123")
+        if not scientist or not admin:
+            print("❌ Login failed.")
+            return False
+
+        for _ in range(WORKERS * 20):
+            if protected_status(scientist) != 200:
+                print("❌ Warm-up request rejected.")
+                return False
+
+        revoked_at = time.time()
+        response = requests.post(f"{BASE_URL}/admin/revoke-user-tokens/cientifico@nexo.com",
+                                 headers={"Authorization": f"Bearer {admin}"})
+        if response.status_code != 200:
+            print(f"❌ Revocation failed: {response.status_code} - {response.text}")
+            return False
+
+        last_accepted = None
+        probes = 0
+        while time.time() - revoked_at < 2:
+            probes += 1
+            if protected_status(scientist) == 200:
+                last_accepted = time.time()
+
+        if last_accepted is None:
+            print(f"✅ Revoked token rejected by every worker from the first of {probes} probes.")
+            return True
+        stale_ms = (last_accepted - revoked_at) * 1000
+        print(f"{'✅' if stale_ms <= MAX_PROPAGATION_MS else '❌'} Revoked token last accepted "
+              f"{stale_ms:.1f} ms after the revocation ({probes} probes).")
+        return stale_ms <= MAX_PROPAGATION_MS
+    finally:
+        print("🛑 Stopping Server...")
+        server.terminate()
+        server.wait()
+
+
+def main():
+    print("🚀 Starting Invalidation Bus Verification...")
+
+    print_step(1, f"Bus propagation to {WORKERS} worker processes")
+    if not check_bus_propagation():
+        sys.exit(1)
+
+    print_step(2, f"Token revocation across {WORKERS} uvicorn workers")
+    if not check_revocation_across_workers():
+        sys.exit(1)
+
+    print("\n🎉 ALL CHECKS PASSED! Invalidations reach every worker.")
+
+
+if __name__ == "__main__":
+    main()